@@ -0,0 +1,214 @@
+"""
+Local stand-in web server for the offline benchmarks.
+
+Serves the recorded pages in ./fixtures under stable routes and generates
+PNG images of any requested size, so the scrapers can run end to end
+without touching Naver or Agoda.
+
+Routes:
+    /naver/image?query=...      -> fixtures/naver_image_serp.html
+    /naver/image-empty          -> fixtures/naver_image_empty.html (no results)
+    /naver/image-paging?query=... -> fixtures/naver_image_paging.json (paging endpoint, json_type=6)
+    /naver/netflix              -> fixtures/naver_netflix_ranking.html
+    /agoda/search               -> fixtures/agoda_search.html
+    /agoda/captcha/<anything>.html -> fixtures/agoda_captcha.html (bot check)
+    /agoda/<anything>.html      -> fixtures/agoda_property.html
+    /agoda/api/cronos/property/BelowFoldParams/GetSecondaryData -> fixtures/agoda_secondary_data.json
+    /agoda/graphql/property     -> fixtures/agoda_room_grid.json
+    /image/<W>x<H>.png          -> generated W x H PNG
+
+Usage:
+    python fixture_server.py --port 8765
+"""
+
+import argparse
+import functools
+import os
+import re
+import struct
+import threading
+import time
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+HTML = "text/html; charset=utf-8"
+JSON = "application/json; charset=utf-8"
+ROUTES = [
+    (re.compile(r"^/naver/image$"), "naver_image_serp.html", HTML),
+    (re.compile(r"^/naver/image-empty$"), "naver_image_empty.html", HTML),
+    (re.compile(r"^/naver/image-paging$"), "naver_image_paging.json", JSON),
+    (re.compile(r"^/naver/netflix$"), "naver_netflix_ranking.html", HTML),
+    (re.compile(r"^/agoda/search$"), "agoda_search.html", HTML),
+    (re.compile(r"^/agoda/api/cronos/property/BelowFoldParams/GetSecondaryData$"), "agoda_secondary_data.json", JSON),
+    (re.compile(r"^/agoda/graphql/property$"), "agoda_room_grid.json", JSON),
+    (re.compile(r"^/agoda/captcha/.+\.html$"), "agoda_captcha.html", HTML),
+    (re.compile(r"^/agoda/.+\.html$"), "agoda_property.html", HTML),
+]
+IMAGE_ROUTE = re.compile(r"^/image/(\d+)x(\d+)\.png$")
+MAX_IMAGE_SIDE = 4096
+
+
+@functools.lru_cache(maxsize=64)
+def make_png(width, height):
+    """ Builds a valid W x H RGB PNG with a simple gradient so it is not trivially compressible. """
+    template = bytearray(width * 3)
+    template[1::3] = bytes((x * 7) & 0xFF for x in range(width))
+    template[2::3] = b"\x80" * width
+    rows = []
+    for y in range(height):
+        row = bytearray(template)
+        row[0::3] = bytes((y * 255 // max(height - 1, 1),)) * width
+        rows.append(b"\x00" + bytes(row))  # filter type 0 per scanline
+    raw = b"".join(rows)
+
+    def chunk(tag, data):
+        body = tag + data
+        return struct.pack(">I", len(data)) + body + struct.pack(">I", zlib.crc32(body) & 0xFFFFFFFF)
+
+    header = struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0)
+    return b"\x89PNG\r\n\x1a\n" + chunk(b"IHDR", header) + chunk(b"IDAT", zlib.compress(raw, 6)) + chunk(b"IEND", b"")
+
+
+@functools.lru_cache(maxsize=None)
+def load_fixture(name):
+    with open(os.path.join(FIXTURE_DIR, name), "rb") as f:
+        return f.read()
+
+
+class FixtureHandler(BaseHTTPRequestHandler):
+    latency = 0.0  # seconds added to every response, set by FixtureServer
+    max_concurrency = None  # answer 429 above this many in-flight requests (a throttling site)
+    in_flight = None  # shared [count] per server
+    in_flight_lock = None
+
+    def log_message(self, format, *args):
+        pass  # keep benchmark output clean
+
+    def _send(self, status, body, content_type):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("Accept-Ranges", "bytes")
+        self.end_headers()
+        if self.command != "HEAD":
+            self.wfile.write(body)
+
+    def _send_range(self, body, content_type):
+        """ Honours a single 'bytes=start-end' Range header; falls back to the full body. """
+        match = re.match(r"bytes=(\d+)-(\d*)$", self.headers.get("Range", ""))
+        if not match:
+            return self._send(200, body, content_type)
+        start = int(match.group(1))
+        end = int(match.group(2)) if match.group(2) else len(body) - 1
+        end = min(end, len(body) - 1)
+        if start > end:
+            self.send_response(416)
+            self.send_header("Content-Range", f"bytes */{len(body)}")
+            self.end_headers()
+            return
+        part = body[start:end + 1]
+        self.send_response(206)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(part)))
+        self.send_header("Content-Range", f"bytes {start}-{end}/{len(body)}")
+        self.end_headers()
+        if self.command != "HEAD":
+            self.wfile.write(part)
+
+    def do_GET(self):
+        with self.in_flight_lock:
+            self.in_flight[0] += 1
+            throttled = self.max_concurrency is not None and self.in_flight[0] > self.max_concurrency
+        try:
+            if throttled:
+                return self._send(429, b"too many requests", "text/plain")
+            self._handle_get()
+        finally:
+            with self.in_flight_lock:
+                self.in_flight[0] -= 1
+
+    def _handle_get(self):
+        if self.latency:
+            time.sleep(self.latency)
+        path = urlsplit(self.path).path
+
+        image_match = IMAGE_ROUTE.match(path)
+        if image_match:
+            width, height = int(image_match.group(1)), int(image_match.group(2))
+            if not (0 < width <= MAX_IMAGE_SIDE and 0 < height <= MAX_IMAGE_SIDE):
+                return self._send(400, b"bad size", "text/plain")
+            return self._send_range(make_png(width, height), "image/png")
+
+        for pattern, fixture, content_type in ROUTES:
+            if pattern.match(path):
+                return self._send(200, load_fixture(fixture), content_type)
+        self._send(404, b"not found", "text/plain")
+
+    do_HEAD = do_GET
+
+
+class FixtureServer:
+    """
+    Runs the fixture server on a background thread.
+
+        with FixtureServer() as server:
+            requests.get(server.url("/naver/netflix"))
+    """
+
+    def __init__(self, host="127.0.0.1", port=0, latency=0.0, max_concurrency=None):
+        handler = type("Handler", (FixtureHandler,), {
+            "latency": latency,
+            "max_concurrency": max_concurrency,
+            "in_flight": [0],
+            "in_flight_lock": threading.Lock(),
+        })
+        self.httpd = ThreadingHTTPServer((host, port), handler)
+        self.httpd.daemon_threads = True
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    @property
+    def base_url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def url(self, path):
+        return self.base_url + path
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+        return False
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve recorded scraper fixtures locally.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds added to every response")
+    args = parser.parse_args()
+
+    server = FixtureServer(args.host, args.port, args.latency)
+    print(f"Serving fixtures on {server.base_url} (Ctrl+C to stop)")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.httpd.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,36 @@
+"""
+Refreshes the HTML fixtures from the live sites using
+common tools/get_all_html.py, so the offline benchmarks track the current
+page structure.
+
+Usage:
+    python record_fixtures.py naver_image_serp "https://search.naver.com/search.naver?...&query=..."
+    python record_fixtures.py agoda_property "https://www.agoda.com/ko-kr/virgo-hotel/hotel/nha-trang-vn.html"
+
+Recorded pages usually need light editing afterwards: absolute image URLs
+must be rewritten to /image/<W>x<H>.png, and the Naver image viewer script
+replaced with the stand-in in the existing fixture.
+"""
+
+import argparse
+import os
+import sys
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+sys.path.append(os.path.join(ROOT_DIR, "common tools"))
+
+from get_all_html import save_response_html_to_file  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Record a live page into benchmarks/fixtures.")
+    parser.add_argument("name", help="fixture name without .html (e.g. agoda_property)")
+    parser.add_argument("url")
+    args = parser.parse_args()
+
+    save_response_html_to_file(args.url, filename=os.path.join(FIXTURE_DIR, f"{args.name}.html"))
+
+
+if __name__ == "__main__":
+    main()
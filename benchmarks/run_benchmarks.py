@@ -0,0 +1,476 @@
+"""
+Offline benchmark suite for the scrapers.
+
+Starts the local fixture server (fixture_server.py), points each scraper at
+it and reports pages/second, per-field extraction latency (taken from the
+metrics layer in common tools/metrics.py) and peak RSS.
+
+Benchmarks:
+    requests   drama_of_netflix.scrape_with_requests
+    selenium   drama_of_netflix.scrape_with_selenium        (needs Chrome)
+    agoda      agoda_hotel_scraper.scrape_agoda_hotel_info  (needs Chrome + config.txt)
+    agoda-capture agoda_hotel_scraper.scrape_agoda_hotel_info(capture_network=True) (needs Chrome + config.txt)
+    agoda-prices agoda_hotel_scraper.extract_listing_prices  (needs Chrome)
+    images     hotel_image_naver.get_actual_image_url + download_image (needs Chrome)
+    page-state   time to fail on a Naver "no results" page and an Agoda captcha page (needs Chrome + config.txt)
+    image-probe  image_probe.probe_images + rank_candidates on the fixture tiles
+    image-api    naver_image_api.fetch_tiles + candidates_from_tiles (browserless tile discovery, paging JSON and HTML)
+    proxy-pool   proxy_pool.get through stand-in proxies (fast, slow, throttled, dead)
+    adaptive     AIMD limiter vs fixed 16 workers against a host that throttles above 6 concurrent requests
+
+Benchmarks whose dependencies are missing are reported as skipped.
+
+Usage:
+    python run_benchmarks.py                      # run everything, print results
+    python run_benchmarks.py --only requests -n 50
+    python run_benchmarks.py --save-baseline      # write baseline.json
+    python run_benchmarks.py --compare            # exit 1 on regression vs baseline.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+BASELINE_PATH = os.path.join(BENCH_DIR, "baseline.json")
+
+for sub_dir in ("common tools", "get_drama_of_netflix", "get_hotel_info", "get_hotel_image"):
+    sys.path.append(os.path.join(ROOT_DIR, sub_dir))
+sys.path.insert(0, BENCH_DIR)
+
+import metrics  # noqa: E402
+from fixture_server import FixtureServer  # noqa: E402
+from stand_in_proxy import StandInProxy  # noqa: E402
+
+
+class BenchmarkSkipped(Exception):
+    pass
+
+
+def _peak_rss_mb():
+    """
+    Peak RSS of this process and of its reaped children (chromedriver/Chrome), in MB.
+    Returns (None, None) where the resource module is unavailable (Windows).
+    """
+    try:
+        import resource
+    except ImportError:
+        return None, None
+    scale = 1024 * 1024 if platform.system() == "Darwin" else 1024  # ru_maxrss: bytes on macOS, KB on Linux
+    own = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / scale
+    children = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / scale
+    return round(own, 1), round(children, 1)
+
+
+def _stage_latencies(stage):
+    """ Mean latency per label set for one stage, read from the metrics snapshot. """
+    result = {}
+    for row in metrics.snapshot():
+        if row["type"] != "histogram" or row["name"] != metrics.STAGE_METRIC:
+            continue
+        labels = dict(row["labels"])
+        if labels.pop("stage") != stage or not row["count"]:
+            continue
+        labels.pop("outcome", None)
+        key = ",".join(f"{k}={v}" for k, v in sorted(labels.items())) or "all"
+        result[key] = round(row["sum"] / row["count"], 4)
+    return result
+
+
+def _import(module_name):
+    try:
+        return __import__(module_name)
+    except ImportError as e:
+        raise BenchmarkSkipped(f"missing dependency: {e}")
+    except (OSError, KeyError) as e:
+        raise BenchmarkSkipped(f"module could not load its config: {e!r}")
+
+
+def _run_pages(iterations, fetch_once):
+    started = time.perf_counter()
+    failures = 0
+    for _ in range(iterations):
+        if not fetch_once():
+            failures += 1
+    elapsed = time.perf_counter() - started
+    return {
+        "pages": iterations,
+        "failures": failures,
+        "seconds": round(elapsed, 3),
+        "pages_per_sec": round(iterations / elapsed, 3) if elapsed else None,
+    }
+
+
+def bench_requests(server, iterations):
+    drama = _import("drama_of_netflix")
+    url = server.url("/naver/netflix")
+    return _run_pages(iterations, lambda: drama.scrape_with_requests(url)["success_status"])
+
+
+def bench_selenium(server, iterations):
+    drama = _import("drama_of_netflix")
+    _import("selenium")
+    url = server.url("/naver/netflix")
+    return _run_pages(iterations, lambda: drama.scrape_with_selenium(url)["success_status"])
+
+
+def bench_agoda(server, iterations):
+    agoda = _import("agoda_hotel_scraper")
+    url = server.url("/agoda/virgo-hotel/hotel/nha-trang-vn.html")
+    result = _run_pages(iterations, lambda: agoda.scrape_agoda_hotel_info(url)["Hotel Name"] != "N/A")
+    result["field_latency"] = _stage_latencies("agoda_field")
+    return result
+
+
+def bench_agoda_capture(server, iterations):
+    agoda = _import("agoda_hotel_scraper")
+    url = server.url("/agoda/virgo-hotel/hotel/nha-trang-vn.html")
+    result = _run_pages(
+        iterations, lambda: "Room Prices" in agoda.scrape_agoda_hotel_info(url, capture_network=True)
+    )
+    result["stage_latency"] = {"agoda_network_capture": _stage_latencies("agoda_network_capture").get("all")}
+    return result
+
+
+def bench_agoda_prices(server, iterations):
+    agoda = _import("agoda_hotel_scraper")
+    url = server.url("/agoda/search")
+    try:
+        driver = agoda.create_driver()
+    except Exception as e:
+        raise BenchmarkSkipped(f"Chrome could not start: {e}")
+    found = []
+
+    def fetch_once():
+        found.append(len(agoda.extract_listing_prices(driver, url)))
+        return found[-1] > 0
+
+    try:
+        result = _run_pages(iterations, fetch_once)
+    finally:
+        driver.quit()
+    result["prices_per_page"] = max(found) if found else 0
+    return result
+
+
+def bench_images(server, iterations):
+    naver = _import("hotel_image_naver")
+    search_url = server.url("/naver/image?query=bench")
+    save_dir = tempfile.mkdtemp(prefix="bench_images_")
+    try:
+        driver = naver.setup_driver()
+    except Exception as e:
+        shutil.rmtree(save_dir, ignore_errors=True)
+        raise BenchmarkSkipped(f"Chrome could not start: {e}")
+
+    def fetch_once():
+        image_url = naver.get_actual_image_url(driver, search_url, image_index=1)
+        return bool(image_url and naver.download_image(image_url, save_dir))
+
+    try:
+        result = _run_pages(iterations, fetch_once)
+    finally:
+        driver.quit()
+        shutil.rmtree(save_dir, ignore_errors=True)
+    result["stage_latency"] = {
+        stage: _stage_latencies(stage).get("all")
+        for stage in ("safe_driver_get", "get_actual_image_url", "download_image", "image_transfer", "image_verify")
+    }
+    return result
+
+
+def bench_page_state(server, iterations):
+    naver = _import("hotel_image_naver")
+    agoda = _import("agoda_hotel_scraper")
+    page_state = _import("page_state")
+    empty_url = server.url("/naver/image-empty")
+    captcha_url = server.url("/agoda/captcha/virgo-hotel/hotel/nha-trang-vn.html")
+    try:
+        driver = naver.setup_driver()
+    except Exception as e:
+        raise BenchmarkSkipped(f"Chrome could not start: {e}")
+    states = {}
+
+    def expect_state(site, expected, fetch):
+        try:
+            fetch()
+        except page_state.PageStateError as e:
+            states[site] = e.state
+            return e.state == expected
+        states[site] = page_state.OK
+        return False
+
+    def fetch_once():
+        naver_ok = expect_state("naver_image", page_state.EMPTY,
+                                lambda: naver.get_actual_image_url(driver, empty_url))
+        agoda_ok = expect_state("agoda_property", page_state.CAPTCHA,
+                                lambda: agoda.scrape_agoda_hotel_info(captcha_url, capture_network=False))
+        return naver_ok and agoda_ok
+
+    try:
+        result = _run_pages(iterations, fetch_once)
+    finally:
+        driver.quit()
+    result["states"] = states
+    result["stage_latency"] = _stage_latencies("page_state_wait")  # per site
+    return result
+
+
+def bench_image_probe(server, iterations):
+    probe = _import("image_probe")
+    bs4 = _import("bs4")
+    requests = _import("requests")
+    search_url = server.url("/naver/image?query=bench")
+    soup = bs4.BeautifulSoup(requests.get(search_url, timeout=10).text, "html.parser")
+    tiles = [{"src": img.get("src"), "original": img.get("data-original")}
+             for img in soup.select('div[class*="mod_image_tile"] img')]
+    urls = probe.candidate_urls_from_tiles(tiles, base_url=search_url)
+    ranked = []
+
+    def fetch_once():
+        ranked[:] = probe.rank_candidates(probe.probe_images(urls))
+        return bool(ranked)
+
+    result = _run_pages(iterations, fetch_once)
+    probe_bytes = sum(row["value"] for row in metrics.snapshot() if row["name"] == "image_probe_bytes")
+    full_bytes = sum(len(requests.get(url, timeout=10).content) for url in urls)
+    result["candidates"] = len(urls)
+    result["usable"] = len(ranked)
+    result["probe_kb_per_page"] = round(probe_bytes / iterations / 1024, 1)
+    result["full_kb_per_page"] = round(full_bytes / 1024, 1)
+    result["stage_latency"] = {"probe_image": _stage_latencies("probe_image").get("all")}
+    return result
+
+
+def bench_image_api(server, iterations):
+    api = _import("naver_image_api")
+    probe = _import("image_probe")
+    search_url = server.url("/naver/image?query=bench")
+    results = {}
+    # paging: JSON endpoint answers (sizes known, no probes); serp: endpoint is gone, tiles come from the HTML
+    for source, paging_url in (("paging", server.url("/naver/image-paging")), ("serp", server.url("/missing"))):
+        metrics.reset()
+        ranked = []
+
+        def fetch_once():
+            tiles = api.fetch_tiles(search_url, paging_url=paging_url)
+            ranked[:] = probe.rank_candidates(api.candidates_from_tiles(tiles))
+            return bool(ranked)
+
+        result = _run_pages(iterations, fetch_once)
+        counts = {}
+        for row in metrics.snapshot():
+            if row["name"] in ("naver_api_requests", "image_probe_bytes") and row["type"] == "counter":
+                counts[row["name"]] = counts.get(row["name"], 0) + row["value"]
+        result["requests_per_hotel"] = round(counts.get("naver_api_requests", 0) / iterations, 2)
+        result["probe_kb_per_hotel"] = round(counts.get("image_probe_bytes", 0) / iterations / 1024, 1)
+        result["usable"] = len(ranked)
+        results[source] = result
+    return {**results["paging"], "serp_fallback": results["serp"]}
+
+
+def bench_proxy_pool(server, iterations):
+    proxy_pool = _import("proxy_pool")
+    url = server.url("/naver/netflix")
+    proxies = {
+        "fast": StandInProxy(),
+        "slow": StandInProxy(latency=0.2),
+        "throttled": StandInProxy(ban_rate=1.0),
+        "dead": StandInProxy(broken=True),
+    }
+    for proxy in proxies.values():
+        proxy.start()
+    names = {proxy.url: name for name, proxy in proxies.items()}
+    used = {name: 0 for name in proxies}
+
+    class CountingPool(proxy_pool.ProxyPool):
+        def choose(self, host):
+            proxy = super().choose(host)
+            used[names[proxy]] += 1
+            return proxy
+
+    pool = CountingPool(names)
+    requests_per_page = 20
+
+    def fetch_once():
+        ok = 0
+        for _ in range(requests_per_page):
+            try:
+                ok += proxy_pool.get(url, pool=pool, timeout=5).ok
+            except Exception:
+                pass
+        return ok > 0
+
+    try:
+        result = _run_pages(iterations, fetch_once)
+    finally:
+        for proxy in proxies.values():
+            proxy.stop()
+    result["requests_per_page"] = requests_per_page
+    result["requests_by_proxy"] = used
+    result["quarantined"] = sorted(
+        names[proxy] for proxy, hosts in pool.stats().items() if hosts["127.0.0.1"]["quarantined_until"]
+    )
+    return result
+
+
+def bench_adaptive(server, iterations):
+    adaptive_concurrency = _import("adaptive_concurrency")
+    requests = _import("requests")
+    workers, requests_per_page, site_limit = 16, 60, 6
+    results = {}
+    with FixtureServer(latency=0.05, max_concurrency=site_limit) as throttling_server:
+        url = throttling_server.url("/image/640x480.png")
+        host = "127.0.0.1"
+        for mode in ("fixed", "aimd"):
+            limiter = adaptive_concurrency.AdaptiveLimiter(name=f"bench_{mode}")
+            counts = {"ok": 0, "throttled": 0}
+            lock = threading.Lock()
+
+            def fetch(_):
+                if mode == "fixed":
+                    status = requests.get(url, timeout=10).status_code
+                else:
+                    with limiter.acquire(host) as slot:
+                        started = time.perf_counter()
+                        response = requests.get(url, timeout=10)
+                        slot.record_response(response, time.perf_counter() - started)
+                        status = response.status_code
+                with lock:
+                    counts["ok" if status == 200 else "throttled"] += 1
+
+            def fetch_once():
+                with ThreadPoolExecutor(max_workers=workers) as pool:
+                    list(pool.map(fetch, range(requests_per_page)))
+                return counts["ok"] > 0
+
+            result = _run_pages(iterations, fetch_once)
+            result["ok_per_sec"] = round(counts["ok"] / result["seconds"], 1) if result["seconds"] else None
+            result["throttled"] = counts["throttled"]
+            if mode == "aimd":
+                result["final_limit"] = limiter.snapshot()[host]["limit"]
+            results[mode] = result
+    aimd = results["aimd"]
+    aimd["site_limit"] = site_limit
+    aimd["fixed_workers"] = workers
+    aimd["fixed_throttled"] = results["fixed"]["throttled"]
+    aimd["fixed_ok_per_sec"] = results["fixed"]["ok_per_sec"]
+    return aimd
+
+
+BENCHMARKS = {
+    "requests": bench_requests,
+    "selenium": bench_selenium,
+    "agoda": bench_agoda,
+    "agoda-capture": bench_agoda_capture,
+    "agoda-prices": bench_agoda_prices,
+    "images": bench_images,
+    "page-state": bench_page_state,
+    "image-probe": bench_image_probe,
+    "image-api": bench_image_api,
+    "proxy-pool": bench_proxy_pool,
+    "adaptive": bench_adaptive,
+}
+
+
+def run(names, iterations, latency):
+    metrics.enable()
+    results = {}
+    with FixtureServer(latency=latency) as server:
+        for name in names:
+            metrics.reset()
+            print(f"[bench] {name} ...", flush=True)
+            try:
+                result = BENCHMARKS[name](server, iterations)
+            except BenchmarkSkipped as e:
+                result = {"skipped": str(e)}
+            result["peak_rss_mb"], result["peak_rss_children_mb"] = _peak_rss_mb()
+            results[name] = result
+    return {
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "iterations": iterations,
+        "server_latency": latency,
+        "results": results,
+    }
+
+
+def compare(current, baseline, tolerance):
+    """
+    Returns a list of regression messages. Throughput may drop and latency/RSS
+    may grow by at most `tolerance` (fraction) relative to the baseline.
+    """
+    regressions = []
+    for name, result in current["results"].items():
+        base = baseline.get("results", {}).get(name)
+        if not base or "skipped" in result or "skipped" in base:
+            continue
+        if base.get("pages_per_sec") and result.get("pages_per_sec") is not None and \
+                result["pages_per_sec"] < base["pages_per_sec"] * (1 - tolerance):
+            regressions.append(f"{name}: pages/sec {result['pages_per_sec']} < baseline {base['pages_per_sec']}")
+        if base.get("peak_rss_mb") and result.get("peak_rss_mb") and \
+                result["peak_rss_mb"] > base["peak_rss_mb"] * (1 + tolerance):
+            regressions.append(f"{name}: peak RSS {result['peak_rss_mb']}MB > baseline {base['peak_rss_mb']}MB")
+        for section in ("field_latency", "stage_latency"):
+            for key, value in (result.get(section) or {}).items():
+                base_value = (base.get(section) or {}).get(key)
+                if value and base_value and value > base_value * (1 + tolerance):
+                    regressions.append(f"{name}: {section}[{key}] {value}s > baseline {base_value}s")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run offline scraper benchmarks against local fixtures.")
+    parser.add_argument("--only", default=",".join(BENCHMARKS), help="comma separated: " + ",".join(BENCHMARKS))
+    parser.add_argument("-n", "--iterations", type=int, default=5)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds the fixture server adds per response")
+    parser.add_argument("--save-baseline", action="store_true", help=f"write results to {BASELINE_PATH}")
+    parser.add_argument("--compare", action="store_true", help="compare with the baseline, exit 1 on regression")
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    parser.add_argument("--output", help="also write results JSON to this path")
+    args = parser.parse_args()
+
+    names = [name.strip() for name in args.only.split(",") if name.strip()]
+    unknown = [name for name in names if name not in BENCHMARKS]
+    if unknown:
+        parser.error(f"unknown benchmark(s): {', '.join(unknown)}")
+
+    report = run(names, args.iterations, args.latency)
+    print(json.dumps(report, ensure_ascii=False, indent=2))
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+    status = 0
+    # Compare against the previous baseline before --save-baseline overwrites it
+    if args.compare:
+        if not os.path.exists(BASELINE_PATH):
+            print(f"No baseline at {BASELINE_PATH}; run with --save-baseline first.")
+            status = 1
+        else:
+            with open(BASELINE_PATH, "r", encoding="utf-8") as f:
+                baseline = json.load(f)
+            regressions = compare(report, baseline, args.tolerance)
+            for message in regressions:
+                print("REGRESSION:", message)
+            if regressions:
+                status = 1
+            else:
+                print("No regressions against baseline.")
+    if args.save_baseline:
+        with open(BASELINE_PATH, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"Baseline saved: {BASELINE_PATH}")
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
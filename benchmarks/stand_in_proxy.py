@@ -0,0 +1,95 @@
+"""
+Local stand-in HTTP forward proxies for testing common tools/proxy_pool.py.
+
+Each proxy forwards plain-HTTP requests (absolute-URI form, as requests
+sends them to an http:// proxy) to the target and can be told to misbehave:
+
+    latency    seconds added before forwarding (a slow egress)
+    ban_rate   fraction of requests answered with 429 (a throttled IP)
+    broken     drop every connection without a response (a dead proxy)
+
+Usage:
+    with StandInProxy(latency=0.2) as slow, StandInProxy(ban_rate=1.0) as banned:
+        pool = proxy_pool.ProxyPool([slow.url, banned.url])
+"""
+
+import http.client
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+
+HOP_BY_HOP = {"connection", "keep-alive", "proxy-connection", "proxy-authorization", "transfer-encoding", "upgrade"}
+
+
+class StandInProxyHandler(BaseHTTPRequestHandler):
+    latency = 0.0
+    ban_rate = 0.0
+    broken = False
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        if self.broken:
+            self.close_connection = True
+            self.connection.close()
+            return
+        if self.latency:
+            time.sleep(self.latency)
+        if self.ban_rate and random.random() < self.ban_rate:
+            self.send_response(429)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+
+        target = urlsplit(self.path)
+        path = target.path + ("?" + target.query if target.query else "")
+        headers = {k: v for k, v in self.headers.items() if k.lower() not in HOP_BY_HOP}
+        connection = http.client.HTTPConnection(target.hostname, target.port or 80, timeout=10)
+        try:
+            connection.request(self.command, path, headers=headers)
+            upstream = connection.getresponse()
+            body = upstream.read()
+        finally:
+            connection.close()
+        self.send_response(upstream.status)
+        for name, value in upstream.getheaders():
+            if name.lower() not in HOP_BY_HOP and name.lower() != "content-length":
+                self.send_header(name, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if self.command != "HEAD":
+            self.wfile.write(body)
+
+    do_HEAD = do_GET
+
+
+class StandInProxy:
+    def __init__(self, latency=0.0, ban_rate=0.0, broken=False, host="127.0.0.1", port=0):
+        handler = type("Handler", (StandInProxyHandler,),
+                       {"latency": latency, "ban_rate": ban_rate, "broken": broken})
+        self.httpd = ThreadingHTTPServer((host, port), handler)
+        self.httpd.daemon_threads = True
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    @property
+    def url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+        return False
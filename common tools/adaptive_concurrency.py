@@ -0,0 +1,163 @@
+"""
+호스트별 AIMD(additive increase, multiplicative decrease) 동시성 제한기.
+
+고정된 작업자 수 대신, 호스트마다 동시에 보낼 수 있는 요청 수(limit)를 실행 중에 조정합니다.
+    - 성공할 때마다 limit += increase / limit  (limit개가 성공하면 약 +increase, TCP 혼잡 제어와 같은 방식)
+    - 429/403/503, 캡차 페이지, 응답 시간 급증(기준 EWMA의 latency_spike배 초과)이면 limit *= decrease
+      같은 순간에 실패한 요청들이 여러 번 깎지 않도록, 한 번 줄인 뒤 cooldown(기본: 기준 응답 시간 한 번)
+      동안은 다시 줄이지 않음
+limit은 min_limit~max_limit 사이로 유지되며, 호스트별 현재 값은
+metrics 게이지 concurrency_limit{host=...}로 내보냅니다.
+
+사용 예:
+    limiter = adaptive_concurrency.default_limiter()
+    with limiter.acquire("search.pstatic.net") as slot:   # limit만큼만 동시에 통과
+        started = time.perf_counter()
+        response = requests.get(url, stream=True)
+        slot.record_response(response, time.perf_counter() - started)
+
+환경 변수:
+    SCRAPING_MAX_CONCURRENCY   호스트당 최대 동시 요청 수 (기본 16)
+"""
+
+import contextlib
+import logging
+import os
+import threading
+import time
+
+import metrics
+import proxy_pool
+
+THROTTLE_STATUS_CODES = (403, 429, 503)
+
+
+class _HostState:
+    def __init__(self, limit):
+        self.limit = float(limit)
+        self.in_flight = 0
+        self.baseline = None  # 성공한 요청의 응답 시간 EWMA
+        self.samples = 0
+        self.last_decrease = 0.0
+
+
+class Slot:
+    """ acquire()가 돌려주는 요청 한 건의 결과 기록기 """
+
+    def __init__(self, limiter, host):
+        self.limiter = limiter
+        self.host = host
+        self.recorded = False
+
+    def record(self, ok=True, throttled=False, latency=None):
+        self.recorded = True
+        self.limiter._on_result(self.host, ok, throttled, latency)
+
+    def record_response(self, response, latency=None):
+        """ requests 응답의 상태 코드와 URL(캡차 리다이렉트)로 성공/스로틀을 판단해 기록 """
+        throttled = is_throttle_response(response)
+        self.record(ok=response.ok and not throttled, throttled=throttled, latency=latency)
+        return throttled
+
+
+class AdaptiveLimiter:
+    def __init__(self, initial=2, min_limit=1, max_limit=None, increase=1.0, decrease=0.5,
+                 latency_spike=3.0, cooldown=None, name="default"):
+        self.initial = initial
+        self.min_limit = min_limit
+        self.max_limit = max_limit or int(os.environ.get("SCRAPING_MAX_CONCURRENCY", "16"))
+        self.increase = increase
+        self.decrease = decrease
+        self.latency_spike = latency_spike
+        self.cooldown = cooldown
+        self.name = name
+        self._hosts = {}
+        self._cond = threading.Condition()
+
+    def _state(self, host):
+        if host not in self._hosts:
+            self._hosts[host] = _HostState(self.initial)
+            self._publish(host, self._hosts[host])
+        return self._hosts[host]
+
+    def _publish(self, host, state):
+        metrics.set_gauge("concurrency_limit", round(state.limit, 2), host=host, limiter=self.name)
+
+    def limit(self, host):
+        with self._cond:
+            return int(self._state(host).limit)
+
+    @contextlib.contextmanager
+    def acquire(self, host):
+        """ host의 동시 요청 수가 limit 미만이 될 때까지 기다렸다가 슬롯을 내줌 """
+        with self._cond:
+            state = self._state(host)
+            waited = time.perf_counter()
+            while state.in_flight >= max(int(state.limit), self.min_limit):
+                self._cond.wait()
+            state.in_flight += 1
+        metrics.observe("concurrency_wait_seconds", time.perf_counter() - waited, host=host)
+        slot = Slot(self, host)
+        try:
+            yield slot
+        except Exception:
+            if not slot.recorded:
+                slot.record(ok=False)  # 연결 오류 등: 실패로 세지만 limit은 줄이지 않음
+            raise
+        finally:
+            with self._cond:
+                state.in_flight -= 1
+                self._cond.notify_all()
+
+    def _on_result(self, host, ok, throttled, latency):
+        with self._cond:
+            state = self._state(host)
+            now = time.monotonic()
+            spike = (
+                ok and latency is not None and state.baseline is not None and state.samples >= 5
+                and latency > state.baseline * self.latency_spike
+            )
+            if ok and latency is not None and not spike:
+                state.baseline = latency if state.baseline is None else 0.8 * state.baseline + 0.2 * latency
+                state.samples += 1
+
+            if throttled or spike:
+                cooldown = self.cooldown if self.cooldown is not None else (state.baseline or 0.1)
+                if now - state.last_decrease >= cooldown:
+                    old = state.limit
+                    state.limit = max(self.min_limit, state.limit * self.decrease)
+                    state.last_decrease = now
+                    reason = "throttled" if throttled else "latency_spike"
+                    metrics.incr("concurrency_decreases", host=host, reason=reason)
+                    logging.info(f"{host} 동시성 감소 {old:.1f} → {state.limit:.1f} ({reason})")
+            elif ok:
+                state.limit = min(self.max_limit, state.limit + self.increase / state.limit)
+            self._publish(host, state)
+            self._cond.notify_all()  # limit이 늘었으면 대기 중인 요청을 깨움
+
+    def snapshot(self):
+        """ {host: {"limit", "in_flight", "baseline_latency"}} """
+        with self._cond:
+            return {
+                host: {"limit": round(state.limit, 2), "in_flight": state.in_flight,
+                       "baseline_latency": round(state.baseline, 4) if state.baseline is not None else None}
+                for host, state in self._hosts.items()
+            }
+
+
+def is_throttle_response(response):
+    """ 속도 제한/차단 응답인지 (상태 코드, 캡차 페이지로의 리다이렉트) """
+    return response.status_code in THROTTLE_STATUS_CODES or proxy_pool.is_ban_response(response)
+
+
+_default_limiter = None
+_default_limiter_lock = threading.Lock()
+
+
+def default_limiter():
+    """ 프로세스 공용 제한기 (호스트별 상태는 모든 호출자가 공유) """
+    global _default_limiter
+    with _default_limiter_lock:
+        if _default_limiter is None:
+            _default_limiter = AdaptiveLimiter()
+        return _default_limiter
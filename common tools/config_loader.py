@@ -0,0 +1,46 @@
+"""
+KEY=VALUE 형식의 config.txt를 읽는 공용 함수.
+
+같은 경로는 프로세스당 한 번만 읽고 캐시하므로, 여러 모듈(또는 scraping.py CLI)이
+같은 설정 파일을 불러도 디스크 I/O와 파싱은 한 번만 일어납니다.
+값의 따옴표/공백 처리는 호출하는 프로젝트마다 달라 strip_quotes로 고릅니다.
+"""
+
+import functools
+import os
+
+
+@functools.lru_cache(maxsize=None)
+def _load(path, strip_quotes):
+    keys = {}
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            if not strip_quotes:
+                # 값을 그대로 보존 (따옴표, 값 안의 공백 유지)
+                if "=" in line:
+                    key, value = line.strip().split("=", 1)
+                    keys[key] = value
+                continue
+            line = line.strip()
+            if not line or line.startswith("#") or "=" not in line:
+                continue
+            key, value = line.split("=", 1)
+            # r"..." 또는 "..." 형태로 적힌 값의 따옴표 제거
+            keys[key.strip()] = value.strip().replace('r"', '').replace('"', '')
+    return keys
+
+
+def load_config(path, strip_quotes=True):
+    """
+    설정 파일을 읽어 dict로 반환 (복사본이므로 수정해도 캐시에 영향 없음)
+
+    Args:
+        strip_quotes (bool): True이면 # 주석을 건너뛰고 키/값의 공백과 r"..."/"..." 따옴표를 제거
+            (get_hotel_info 방식). False이면 줄 양끝 공백만 제거하고 값은 그대로 둠
+            (seo_blogpost_maker 방식).
+    """
+    return dict(_load(os.path.abspath(path), strip_quotes))
+
+
+def clear_cache():
+    _load.cache_clear()
@@ -0,0 +1,152 @@
+"""
+Selenium 진단 자료 수집기.
+
+매 단계마다 스크린샷을 저장하는 대신, 최근 DOM 스냅샷 몇 개를 압축해서 메모리 링 버퍼에
+보관하고, 실패가 발생했을 때만 스크린샷과 HTML을 디스크에 기록합니다.
+
+저장 위치: <base_dir>/<run_id>/<hotel>/<순번>_<label>/
+    screenshot.png    실패 시점 스크린샷
+    page.html         실패 시점 DOM
+    buffer_NN_*.html  실패 직전까지의 스냅샷 (링 버퍼)
+    meta.json         사유, URL, 시각
+
+모드 (환경 변수 SCRAPING_DIAGNOSTICS 또는 생성자 인자):
+    off       아무것도 하지 않음
+    failure   실패 시에만 기록 (기본값)
+    sample    실패 시 + 스냅샷 중 sample_rate 비율만 추가 기록
+    always    모든 스냅샷을 기록 (디버깅용, 기존 동작과 비슷함)
+
+run 디렉터리 전체 크기가 max_bytes를 넘으면 오래된 캡처부터 삭제합니다.
+"""
+
+import collections
+import json
+import logging
+import os
+import random
+import re
+import shutil
+import time
+import zlib
+
+import metrics
+
+MODES = ("off", "failure", "sample", "always")
+DEFAULT_BASE_DIR = os.environ.get("SCRAPING_DIAGNOSTICS_DIR", "./diagnostics")
+RUN_ID = time.strftime("%Y%m%d_%H%M%S")  # 같은 프로세스의 기록은 하나의 run 디렉터리에 모음
+CAPTURE_DIR = re.compile(r"^(\d+)_")  # <순번>_<label>
+
+
+def _safe_name(value):
+    return re.sub(r"[^\w.-]+", "_", str(value)).strip("_") or "default"
+
+
+class DiagnosticsRecorder:
+    def __init__(self, hotel="default", mode=None, sample_rate=None, buffer_size=5,
+                 max_bytes=None, base_dir=None):
+        self.mode = mode or os.environ.get("SCRAPING_DIAGNOSTICS", "failure")
+        if self.mode not in MODES:
+            raise ValueError(f"diagnostics mode must be one of {MODES}: {self.mode}")
+        self.sample_rate = sample_rate if sample_rate is not None else \
+            float(os.environ.get("SCRAPING_DIAGNOSTICS_SAMPLE_RATE", "0.05"))
+        self.max_bytes = max_bytes if max_bytes is not None else \
+            int(float(os.environ.get("SCRAPING_DIAGNOSTICS_MAX_MB", "50")) * 1024 * 1024)
+        self.run_dir = os.path.join(base_dir or DEFAULT_BASE_DIR, RUN_ID)
+        self.hotel_dir = os.path.join(self.run_dir, _safe_name(hotel))
+        self.buffer = collections.deque(maxlen=buffer_size)
+        self._seq = 0
+
+    @property
+    def enabled(self):
+        return self.mode != "off"
+
+    def snapshot(self, driver, label):
+        """
+        현재 DOM을 링 버퍼에 넣습니다 (page_source를 zlib 레벨 1로 압축, PNG 인코딩 없음).
+        sample/always 모드에서는 조건에 따라 바로 디스크에도 기록합니다.
+        """
+        if not self.enabled:
+            return
+        try:
+            with metrics.timer("diagnostics_snapshot"):
+                html = driver.page_source
+                self.buffer.append((time.time(), label, driver.current_url,
+                                    zlib.compress(html.encode("utf-8"), 1)))
+        except Exception as e:
+            logging.warning(f"진단 스냅샷 실패({label}): {e}")
+            return
+        if self.mode == "always" or (self.mode == "sample" and random.random() < self.sample_rate):
+            self.capture(driver, label, reason="sampled")
+
+    def capture_failure(self, driver, reason):
+        """ 실패 시점의 스크린샷, DOM, 링 버퍼를 기록하고 저장 경로를 반환 """
+        if not self.enabled:
+            return None
+        return self.capture(driver, "failure", reason=reason)
+
+    def _new_capture_dir(self, label):
+        """
+        hotel 디렉터리의 기존 캡처 다음 순번으로 디렉터리를 만듭니다.
+        같은 run/hotel에 대해 새로 만든 수집기도 앞선 캡처를 덮어쓰지 않으며,
+        동시에 같은 순번을 잡으면 다음 순번을 씁니다.
+        """
+        os.makedirs(self.hotel_dir, exist_ok=True)
+        existing = [int(match.group(1)) for match in map(CAPTURE_DIR.match, os.listdir(self.hotel_dir)) if match]
+        self._seq = max(existing + [self._seq])
+        while True:
+            self._seq += 1
+            capture_dir = os.path.join(self.hotel_dir, f"{self._seq:03d}_{_safe_name(label)}")
+            try:
+                os.makedirs(capture_dir)
+                return capture_dir
+            except FileExistsError:
+                continue
+
+    def capture(self, driver, label, reason):
+        try:
+            with metrics.timer("diagnostics_capture", reason="failure" if label == "failure" else "sampled"):
+                capture_dir = self._new_capture_dir(label)
+                meta = {"reason": reason, "label": label, "captured_at": time.strftime("%Y-%m-%d %H:%M:%S")}
+                try:
+                    meta["url"] = driver.current_url
+                    with open(os.path.join(capture_dir, "page.html"), "w", encoding="utf-8") as f:
+                        f.write(driver.page_source)
+                    driver.save_screenshot(os.path.join(capture_dir, "screenshot.png"))
+                except Exception as e:
+                    meta["driver_error"] = str(e)  # 드라이버가 죽은 경우에도 링 버퍼는 남김
+
+                meta["buffer"] = []
+                for i, (taken_at, buf_label, url, compressed) in enumerate(self.buffer):
+                    name = f"buffer_{i:02d}_{_safe_name(buf_label)}.html"
+                    with open(os.path.join(capture_dir, name), "wb") as f:
+                        f.write(zlib.decompress(compressed))
+                    meta["buffer"].append({"file": name, "url": url,
+                                           "taken_at": time.strftime("%H:%M:%S", time.localtime(taken_at))})
+                with open(os.path.join(capture_dir, "meta.json"), "w", encoding="utf-8") as f:
+                    json.dump(meta, f, ensure_ascii=False, indent=2)
+            metrics.incr("diagnostics_captures", label=label)
+            logging.info(f"진단 자료 저장됨: {capture_dir} ({reason})")
+        except Exception as e:
+            logging.error(f"진단 자료 저장 실패: {e}")
+            return None
+        self._enforce_size_cap(keep=capture_dir)
+        return capture_dir
+
+    def _enforce_size_cap(self, keep):
+        """ run 디렉터리가 max_bytes를 넘으면 가장 오래된 캡처 디렉터리부터 삭제 """
+        captures = []
+        total = 0
+        for root, dirs, files in os.walk(self.run_dir):
+            if root.count(os.sep) - self.run_dir.count(os.sep) != 2:
+                continue  # <run>/<hotel>/<capture> 깊이만 대상
+            size = sum(os.path.getsize(os.path.join(root, name)) for name in files)
+            captures.append((os.path.getmtime(root), root, size))
+            total += size
+        for _, path, size in sorted(captures):
+            if total <= self.max_bytes:
+                break
+            if os.path.abspath(path) == os.path.abspath(keep):
+                continue
+            shutil.rmtree(path, ignore_errors=True)
+            total -= size
+            logging.info(f"진단 자료 용량 제한으로 삭제: {path}")
@@ -1,7 +1,8 @@
-import requests
 import logging
 from fake_useragent import UserAgent
 
+import proxy_pool
+
 # 로깅 설정: INFO 레벨 메시지를 콘솔에 출력
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
@@ -17,7 +18,7 @@ def save_response_html_to_file(url, filename="response.html"):
     logging.info(f"Using User-Agent: {headers['User-Agent']}")
     
     try:
-        response = requests.get(url, headers=headers, timeout=10)
+        response = proxy_pool.get(url, headers=headers, timeout=10)  # SCRAPING_PROXIES가 있으면 프록시 사용
         response.raise_for_status()  # HTTP 오류 발생 시 예외 발생
     except Exception as e:
         logging.error(f"Failed to fetch page: {e}")
@@ -31,6 +32,30 @@ def save_response_html_to_file(url, filename="response.html"):
     except Exception as e:
         logging.error(f"Failed to save HTML to file: {e}")
 
+def archive_response_html(url, archive_dir="html_archive"):
+    """
+    주어진 URL의 HTML을 HtmlArchive(html_archive.py)에 압축 저장하는 함수입니다.
+    - 응답 바이트를 스트리밍으로 압축하므로 본문 전체를 문자열로 올리지 않습니다.
+    - 같은 내용의 페이지는 한 번만 저장되고, URL/시각/해시는 index.jsonl에 남습니다.
+    - 저장된 항목(dict)을 반환하며, 실패 시 None을 반환합니다.
+    """
+    from html_archive import HtmlArchive
+
+    ua = UserAgent()
+    headers = {'User-Agent': ua.random}
+    logging.info(f"Using User-Agent: {headers['User-Agent']}")
+
+    try:
+        with proxy_pool.get(url, headers=headers, timeout=10, stream=True) as response:
+            entry = HtmlArchive(archive_dir).store_response(url, response)
+    except Exception as e:
+        logging.error(f"Failed to archive page: {e}")
+        return None
+    state = "deduplicated" if entry["deduplicated"] else "stored"
+    logging.info(f"HTML {state} in archive: {entry['sha256'][:12]} "
+                 f"({entry['raw_bytes']} bytes -> {entry['stored_bytes']} bytes)")
+    return entry
+
 if __name__ == "__main__":
     # 테스트용 URL (필요한 URL로 변경 가능)
     url = "https://m.search.naver.com/search.naver?ssc=tab.m_image.all&where=m_image&sm=tab_jum&query=%EB%82%98%ED%8A%B8%EB%9E%91+%EB%A0%88%EC%8A%A4%EC%B0%B8%ED%98%B8%ED%85%94"
@@ -0,0 +1,264 @@
+"""
+내용 주소 기반(content-addressed) HTML 스냅샷 보관소.
+
+응답 바이트를 받는 대로 zstd(설치되어 있지 않으면 gzip) 프레임으로 압축하며 저장하고,
+같은 페이지는 SHA-256 해시로 중복 제거합니다. 어떤 URL을 언제 가져왔는지는
+index.jsonl에 한 줄씩 기록합니다.
+
+디렉터리 구조:
+    <root>/index.jsonl                 {"url", "fetched_at", "sha256", "raw_bytes", "stored_bytes", ...}
+    <root>/blobs/ab/abcdef....html.zst  압축된 본문 (해시 앞 두 글자로 분산)
+
+사용 예:
+    archive = HtmlArchive("html_archive")
+    entry = archive.fetch(url)                   # 스트리밍 다운로드 + 저장
+    for entry in archive.entries(url): ...       # 특정 URL의 스냅샷 목록
+    with archive.open_blob(entry["sha256"]) as f:  # 스트리밍 재생
+        html = f.read().decode(entry["encoding"] or "utf-8")
+    print(archive.stats())                       # 원본 파일 대비 절감량
+
+명령행:
+    python html_archive.py stats html_archive
+    python html_archive.py list html_archive [URL]
+    python html_archive.py cat html_archive SHA256
+"""
+
+import argparse
+import gzip
+import hashlib
+import io
+import json
+import logging
+import os
+import sys
+import tempfile
+import threading
+import time
+
+try:
+    import zstandard
+except ImportError:  # zstandard가 없으면 표준 라이브러리 gzip 사용
+    zstandard = None
+
+CHUNK_SIZE = 64 * 1024
+CODEC_EXTENSIONS = {"zstd": ".html.zst", "gzip": ".html.gz"}
+
+
+class HtmlArchive:
+    def __init__(self, root, codec=None, level=None):
+        self.root = root
+        self.codec = codec or ("zstd" if zstandard else "gzip")
+        if self.codec not in CODEC_EXTENSIONS:
+            raise ValueError(f"unknown codec: {self.codec}")
+        if self.codec == "zstd" and zstandard is None:
+            raise RuntimeError("zstd codec requires the 'zstandard' package")
+        self.level = level if level is not None else (10 if self.codec == "zstd" else 6)
+        self.index_path = os.path.join(root, "index.jsonl")
+        self.blob_dir = os.path.join(root, "blobs")
+        self._lock = threading.Lock()
+        os.makedirs(self.blob_dir, exist_ok=True)
+
+    # ------------------------------------------------------------------
+    # 저장
+    # ------------------------------------------------------------------
+
+    def _blob_path(self, sha256, codec):
+        return os.path.join(self.blob_dir, sha256[:2], sha256 + CODEC_EXTENSIONS[codec])
+
+    def find_blob(self, sha256):
+        """ 해시에 해당하는 blob 경로와 코덱을 반환 (없으면 (None, None)) """
+        for codec in CODEC_EXTENSIONS:
+            path = self._blob_path(sha256, codec)
+            if os.path.exists(path):
+                return path, codec
+        return None, None
+
+    def _compressing_writer(self, fh):
+        if self.codec == "zstd":
+            return zstandard.ZstdCompressor(level=self.level).stream_writer(fh, closefd=False)
+        return gzip.GzipFile(fileobj=fh, mode="wb", compresslevel=self.level, mtime=0)
+
+    def store_stream(self, url, chunks, **meta):
+        """
+        바이트 청크를 압축하며 임시 파일에 쓰고, 해시가 이미 있으면 임시 파일을 버립니다.
+        본문 전체를 메모리에 올리지 않습니다.
+
+        Returns:
+            dict: index.jsonl에 기록된 항목 (deduplicated=True이면 기존 blob 재사용)
+        """
+        digest = hashlib.sha256()
+        raw_bytes = 0
+        fd, tmp_path = tempfile.mkstemp(dir=self.blob_dir, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as fh:
+                with self._compressing_writer(fh) as writer:
+                    for chunk in chunks:
+                        if not chunk:
+                            continue
+                        digest.update(chunk)
+                        raw_bytes += len(chunk)
+                        writer.write(chunk)
+            sha256 = digest.hexdigest()
+
+            with self._lock:
+                existing_path, existing_codec = self.find_blob(sha256)
+                if existing_path:
+                    os.remove(tmp_path)
+                    deduplicated = True
+                    blob_path, blob_codec = existing_path, existing_codec
+                else:
+                    blob_path, blob_codec = self._blob_path(sha256, self.codec), self.codec
+                    os.makedirs(os.path.dirname(blob_path), exist_ok=True)
+                    os.replace(tmp_path, blob_path)
+                    deduplicated = False
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+        entry = {
+            "url": url,
+            "fetched_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "sha256": sha256,
+            "raw_bytes": raw_bytes,
+            "stored_bytes": os.path.getsize(blob_path),
+            "codec": blob_codec,
+            "deduplicated": deduplicated,
+        }
+        entry.update(meta)
+        with self._lock, open(self.index_path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        return entry
+
+    def store_bytes(self, url, data, **meta):
+        return self.store_stream(url, [data], **meta)
+
+    def fetch(self, url, session=None, headers=None, timeout=10):
+        """ requests로 URL을 스트리밍 다운로드하여 저장 (HTTP 오류 시 예외) """
+        import requests
+
+        getter = session or requests
+        with getter.get(url, headers=headers, timeout=timeout, stream=True) as response:
+            return self.store_response(url, response)
+
+    def store_response(self, url, response):
+        """ stream=True로 받은 requests 응답을 저장 (HTTP 오류 시 예외) """
+        response.raise_for_status()
+        return self.store_stream(
+            url,
+            response.iter_content(chunk_size=CHUNK_SIZE),
+            status=response.status_code,
+            content_type=response.headers.get("Content-Type"),
+            encoding=response.encoding,
+        )
+
+    # ------------------------------------------------------------------
+    # 조회 / 재생
+    # ------------------------------------------------------------------
+
+    def entries(self, url=None):
+        """ index.jsonl 항목을 순서대로 반환 (url을 주면 해당 URL만) """
+        if not os.path.exists(self.index_path):
+            return
+        with open(self.index_path, "r", encoding="utf-8") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                entry = json.loads(line)
+                if url is None or entry["url"] == url:
+                    yield entry
+
+    def latest(self, url):
+        last = None
+        for entry in self.entries(url):
+            last = entry
+        return last
+
+    def open_blob(self, sha256):
+        """ 압축을 풀면서 읽는 바이너리 스트림을 반환 (with 문으로 사용) """
+        path, codec = self.find_blob(sha256)
+        if not path:
+            raise FileNotFoundError(f"blob not found: {sha256}")
+        if codec == "gzip":
+            return gzip.open(path, "rb")
+        if zstandard is None:
+            raise RuntimeError("reading zstd blobs requires the 'zstandard' package")
+        fh = open(path, "rb")
+        return io.BufferedReader(zstandard.ZstdDecompressor().stream_reader(fh, closefd=True))
+
+    def iter_chunks(self, sha256, chunk_size=CHUNK_SIZE):
+        with self.open_blob(sha256) as f:
+            while True:
+                chunk = f.read(chunk_size)
+                if not chunk:
+                    break
+                yield chunk
+
+    def read_text(self, entry):
+        with self.open_blob(entry["sha256"]) as f:
+            return f.read().decode(entry.get("encoding") or "utf-8", errors="replace")
+
+    def stats(self):
+        """
+        raw_bytes: 스냅샷마다 원본 파일로 저장했을 때의 총 크기
+        stored_bytes: 실제 디스크 사용량 (고유 blob + index)
+        """
+        snapshots = 0
+        raw_total = 0
+        for entry in self.entries():
+            snapshots += 1
+            raw_total += entry["raw_bytes"]
+
+        blobs = 0
+        blob_bytes = 0
+        for root, _, files in os.walk(self.blob_dir):
+            for name in files:
+                if name.endswith(".tmp"):
+                    continue
+                blobs += 1
+                blob_bytes += os.path.getsize(os.path.join(root, name))
+        index_bytes = os.path.getsize(self.index_path) if os.path.exists(self.index_path) else 0
+        stored_total = blob_bytes + index_bytes
+        return {
+            "snapshots": snapshots,
+            "unique_blobs": blobs,
+            "raw_bytes": raw_total,
+            "stored_bytes": stored_total,
+            "saved_bytes": raw_total - stored_total,
+            "ratio": round(raw_total / stored_total, 2) if stored_total else None,
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="HTML 스냅샷 보관소 조회")
+    sub = parser.add_subparsers(dest="command", required=True)
+    stats_parser = sub.add_parser("stats", help="원본 파일 대비 디스크 절감량")
+    stats_parser.add_argument("root")
+    list_parser = sub.add_parser("list", help="스냅샷 목록")
+    list_parser.add_argument("root")
+    list_parser.add_argument("url", nargs="?")
+    cat_parser = sub.add_parser("cat", help="blob 내용을 표준 출력으로")
+    cat_parser.add_argument("root")
+    cat_parser.add_argument("sha256")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    if not os.path.isdir(args.root):
+        parser.error(f"archive not found: {args.root}")
+    archive = HtmlArchive(args.root)
+    if args.command == "stats":
+        stats = archive.stats()
+        print(json.dumps(stats, indent=2))
+        if stats["raw_bytes"]:
+            print(f"원본 {stats['raw_bytes'] / 1024:.1f} KB → 저장 {stats['stored_bytes'] / 1024:.1f} KB "
+                  f"({stats['ratio']}배 절감)")
+    elif args.command == "list":
+        for entry in archive.entries(args.url):
+            print(f"{entry['fetched_at']}  {entry['sha256'][:12]}  {entry['raw_bytes']:>9}  {entry['url']}")
+    else:
+        for chunk in archive.iter_chunks(args.sha256):
+            sys.stdout.buffer.write(chunk)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,257 @@
+"""
+스크래퍼 공용 계측 모듈: 단계별 타이머, 카운터, 게이지를 수집하고
+Prometheus textfile / JSON lines 형식으로 내보냅니다.
+
+사용 예:
+    import metrics
+
+    with metrics.timer("download_image"):
+        ...
+
+    @metrics.timed("scrape_agoda_hotel_info")
+    def scrape_agoda_hotel_info(url): ...
+
+    metrics.incr("sheets_calls", op="update_cell")
+
+환경 변수:
+    SCRAPING_METRICS=1            계측 활성화 (기본값: 비활성)
+    SCRAPING_METRICS_PROM=경로     종료 시 Prometheus textfile 저장
+    SCRAPING_METRICS_JSONL=경로    종료 시 JSON lines 추가 기록
+
+비활성 상태에서 timer()는 공유 no-op 객체를 반환하고 timed()는 플래그 확인 한 번만 하므로
+계측 코드를 넣어 두어도 비용이 거의 없습니다.
+"""
+
+import atexit
+import functools
+import json
+import os
+import threading
+import time
+import uuid
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+STAGE_METRIC = "stage_seconds"
+PROM_PREFIX = "scraping_"
+
+_enabled = False
+_lock = threading.Lock()
+_histograms = {}
+_counters = {}
+_gauges = {}
+_run_id = uuid.uuid4().hex[:12]
+
+
+class Histogram:
+    """ 누적 버킷 히스토그램 (Prometheus histogram과 같은 구조) """
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.bucket_counts = [0] * len(self.buckets)
+        self.count = 0
+        self.sum = 0.0
+        self.min = None
+        self.max = None
+
+    def observe(self, value):
+        self.count += 1
+        self.sum += value
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.bucket_counts[i] += 1
+                break
+
+    def to_dict(self):
+        return {
+            "count": self.count,
+            "sum": round(self.sum, 6),
+            "min": self.min,
+            "max": self.max,
+            "buckets": dict(zip([str(b) for b in self.buckets], self.bucket_counts))
+        }
+
+
+def _key(name, labels):
+    return name, tuple(sorted(labels.items()))
+
+
+def enable():
+    global _enabled
+    _enabled = True
+
+
+def disable():
+    global _enabled
+    _enabled = False
+
+
+def is_enabled():
+    return _enabled
+
+
+def reset():
+    """ 수집된 값을 모두 지웁니다 (벤치마크 반복 측정용) """
+    with _lock:
+        _histograms.clear()
+        _counters.clear()
+        _gauges.clear()
+
+
+def observe(name, value, **labels):
+    if not _enabled:
+        return
+    key = _key(name, labels)
+    with _lock:
+        hist = _histograms.get(key)
+        if hist is None:
+            hist = _histograms[key] = Histogram()
+        hist.observe(value)
+
+
+def incr(name, value=1, **labels):
+    if not _enabled:
+        return
+    key = _key(name, labels)
+    with _lock:
+        _counters[key] = _counters.get(key, 0) + value
+
+
+def set_gauge(name, value, **labels):
+    if not _enabled:
+        return
+    with _lock:
+        _gauges[_key(name, labels)] = value
+
+
+class _NullTimer:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NULL_TIMER = _NullTimer()
+
+
+class _Timer:
+    def __init__(self, stage, labels):
+        self.stage = stage
+        self.labels = labels
+        self.started = None
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        elapsed = time.perf_counter() - self.started
+        outcome = "ok" if exc_type is None else "error"
+        observe(STAGE_METRIC, elapsed, stage=self.stage, outcome=outcome, **self.labels)
+        return False
+
+
+def timer(stage, **labels):
+    """ with 문으로 감싼 구간의 소요 시간을 stage_seconds 히스토그램에 기록 """
+    if not _enabled:
+        return _NULL_TIMER
+    return _Timer(stage, labels)
+
+
+def timed(stage=None, **labels):
+    """ 함수 호출 시간을 기록하는 데코레이터 (stage 기본값: 함수 이름) """
+    def decorator(func):
+        name = stage or func.__name__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return func(*args, **kwargs)
+            with _Timer(name, labels):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def snapshot():
+    """ 현재 수집된 값을 dict 목록으로 반환 """
+    with _lock:
+        rows = []
+        for (name, labels), hist in _histograms.items():
+            rows.append({"type": "histogram", "name": name, "labels": dict(labels), **hist.to_dict()})
+        for (name, labels), value in _counters.items():
+            rows.append({"type": "counter", "name": name, "labels": dict(labels), "value": value})
+        for (name, labels), value in _gauges.items():
+            rows.append({"type": "gauge", "name": name, "labels": dict(labels), "value": value})
+    return rows
+
+
+def _prom_labels(labels, extra=None):
+    items = sorted(labels.items()) + (extra or [])
+    if not items:
+        return ""
+    escaped = ['%s="%s"' % (k, str(v).replace("\\", "\\\\").replace('"', '\\"')) for k, v in items]
+    return "{" + ",".join(escaped) + "}"
+
+
+def export_prometheus(path):
+    """
+    node_exporter textfile collector가 읽을 수 있는 형식으로 저장합니다.
+    임시 파일에 쓴 뒤 교체하므로 수집기가 절반만 쓰인 파일을 읽지 않습니다.
+    """
+    lines = []
+    seen_types = set()
+    # 같은 이름의 시계열이 연속되도록 정렬 (textfile 형식 요구사항)
+    for row in sorted(snapshot(), key=lambda r: (r["type"], r["name"])):
+        name = PROM_PREFIX + row["name"]
+        if row["type"] == "counter" and not name.endswith("_total"):
+            name += "_total"
+        if name not in seen_types:
+            lines.append(f"# TYPE {name} {row['type']}")
+            seen_types.add(name)
+        labels = row["labels"]
+        if row["type"] == "histogram":
+            cumulative = 0
+            for bound, count in row["buckets"].items():
+                cumulative += count
+                lines.append(f"{name}_bucket{_prom_labels(labels, [('le', bound)])} {cumulative}")
+            lines.append(f"{name}_bucket{_prom_labels(labels, [('le', '+Inf')])} {row['count']}")
+            lines.append(f"{name}_sum{_prom_labels(labels)} {row['sum']}")
+            lines.append(f"{name}_count{_prom_labels(labels)} {row['count']}")
+        else:
+            lines.append(f"{name}{_prom_labels(labels)} {row['value']}")
+
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write("\n".join(lines) + "\n")
+    os.replace(tmp_path, path)
+
+
+def export_jsonl(path):
+    """ 지표 하나당 한 줄씩 JSON으로 추가 기록 (실행 간 비교용) """
+    timestamp = time.strftime("%Y-%m-%dT%H:%M:%S")
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "a", encoding="utf-8") as f:
+        for row in snapshot():
+            row.update({"run_id": _run_id, "timestamp": timestamp})
+            f.write(json.dumps(row, ensure_ascii=False) + "\n")
+
+
+def _export_at_exit():
+    prom_path = os.environ.get("SCRAPING_METRICS_PROM")
+    jsonl_path = os.environ.get("SCRAPING_METRICS_JSONL")
+    if not _enabled or not (prom_path or jsonl_path):
+        return
+    if prom_path:
+        export_prometheus(prom_path)
+    if jsonl_path:
+        export_jsonl(jsonl_path)
+
+
+if os.environ.get("SCRAPING_METRICS", "") not in ("", "0"):
+    enable()
+atexit.register(_export_at_exit)
@@ -0,0 +1,199 @@
+"""
+Selenium 페이지 상태 분류기.
+
+페이지 이동 직후 한 번의 JavaScript 호출로 사이트별 DOM/URL 시그니처를 검사해
+페이지를 다음 중 하나로 분류합니다.
+    ok              정상 (핵심 요소가 있음)
+    captcha         캡차/봇 확인 페이지
+    blocked         접근 차단, 속도 제한 안내
+    empty           검색 결과 없음, 판매 종료 등 정상이지만 내용이 없는 페이지
+    layout_changed  timeout까지 아는 요소가 하나도 나타나지 않음 (선택자 갱신 필요)
+
+고정된 time.sleep()과 WebDriverWait(driver, 15) 대신 wait_for_state()를 쓰면
+정상 페이지는 핵심 요소가 나타나는 즉시, 캡차/차단/결과 없음 페이지는 시그니처가
+보이는 즉시(보통 1초 이내) 결과가 나옵니다. 핵심 요소가 XHR 뒤에 그려지는 느린
+페이지를 잘못 판단하지 않도록 layout_changed는 timeout을 다 기다린 뒤에만 반환합니다.
+
+사용 예:
+    driver.get(url)
+    page_state.wait_for_state(driver, "agoda_property")   # ok가 아니면 PageStateError
+
+    state, detail = page_state.classify_html("naver_image", response.text, response.url)  # requests 응답
+"""
+
+import time
+
+import metrics
+
+OK = "ok"
+CAPTCHA = "captcha"
+BLOCKED = "blocked"
+EMPTY = "empty"
+LAYOUT_CHANGED = "layout_changed"
+STATES = (OK, CAPTCHA, BLOCKED, EMPTY, LAYOUT_CHANGED)
+
+
+class PageStateError(Exception):
+    """ 페이지가 ok가 아닐 때 발생. state로 사유를 구분 (captcha/blocked이면 같은 사이트 작업을 중단) """
+
+    def __init__(self, state, site, url, detail=""):
+        self.state = state
+        self.site = site
+        self.url = url
+        self.detail = detail
+        super().__init__(f"{site}: {state} ({detail}) {url}")
+
+    @property
+    def is_ban(self):
+        return self.state in (CAPTCHA, BLOCKED)
+
+
+# 사이트별 시그니처. 각 항목은 CSS 선택자, 본문/제목 텍스트, URL 조각 중 하나라도 맞으면 해당 상태.
+SIGNATURES = {
+    "naver_image": {
+        OK: {"selectors": ['div[class*="mod_image_tile"] img']},
+        CAPTCHA: {"selectors": ["#captcha", "form[action*='captcha']"], "urls": ["captcha"],
+                  "texts": ["자동입력 방지", "보안 절차"]},
+        BLOCKED: {"texts": ["비정상적인 접근", "일시적으로 제한", "접근이 제한"]},
+        EMPTY: {"selectors": [".api_noresult_wrap", ".not_found02"], "texts": ["검색결과가 없습니다"]},
+    },
+    "agoda_property": {
+        OK: {"selectors": ["h1[data-selenium='hotel-header-name']"]},
+        CAPTCHA: {"selectors": ["#px-captcha", "iframe[src*='captcha']"], "urls": ["captcha"],
+                  "texts": ["Press & Hold", "로봇이 아닙니다"]},
+        BLOCKED: {"texts": ["Access Denied", "Request blocked", "접근이 거부"]},
+        EMPTY: {"selectors": ["[data-selenium='property-unavailable']"],
+                "texts": ["더 이상 예약할 수 없는 숙소", "no longer available"]},
+    },
+    "agoda_listing": {
+        OK: {"selectors": ["li[data-selenium='hotel-item']"]},
+        CAPTCHA: {"selectors": ["#px-captcha", "iframe[src*='captcha']"], "urls": ["captcha"],
+                  "texts": ["Press & Hold", "로봇이 아닙니다"]},
+        BLOCKED: {"texts": ["Access Denied", "Request blocked", "접근이 거부"]},
+        EMPTY: {"selectors": ["[data-selenium='no-results']"], "texts": ["검색 결과가 없습니다", "No results found"]},
+    },
+}
+
+# 검사 순서: 차단 신호가 정상 요소보다 우선 (캡차 페이지에도 헤더 등 일부 요소가 남아 있을 수 있음).
+# 선택자/URL을 모든 상태에 대해 먼저 보고, 본문 텍스트는 그 뒤에 봅니다
+# (정상 검색 결과의 제목에 "일시적으로 제한" 같은 문구가 들어 있을 수 있으므로).
+CHECK_ORDER = (CAPTCHA, BLOCKED, OK, EMPTY)
+
+PROBE_SCRIPT = """
+var selectors = arguments[0];
+var found = {};
+for (var i = 0; i < selectors.length; i++) {
+    try { found[selectors[i]] = document.querySelector(selectors[i]) !== null; }
+    catch (e) { found[selectors[i]] = false; }
+}
+var body = document.body ? document.body.innerText || "" : "";
+return {
+    found: found,
+    text: (document.title || "") + "\\n" + body.slice(0, 20000),
+    url: location.href,
+    ready: document.readyState
+};
+"""
+
+
+def _all_selectors(signature):
+    selectors = []
+    for rules in signature.values():
+        selectors.extend(rules.get("selectors", []))
+    return selectors
+
+
+def classify(driver, site):
+    """
+    현재 페이지를 한 번 검사합니다.
+
+    Returns:
+        (state, detail, ready): state는 STATES 중 하나 또는 아직 판단할 수 없으면 None,
+        detail은 일치한 시그니처, ready는 document.readyState == "complete"
+    """
+    signature = SIGNATURES[site]
+    probe = driver.execute_script(PROBE_SCRIPT, _all_selectors(signature))
+    state, detail = _match(signature, probe["found"], probe.get("text", ""), probe.get("url", ""))
+    return state, detail, state is not None or probe.get("ready") == "complete"
+
+
+def classify_html(site, html, url=""):
+    """
+    requests로 받은 HTML을 같은 시그니처로 분류합니다 (브라우저 없이 쓰는 수집기용).
+    JavaScript로 그려지는 요소는 보이지 않으므로, 아무것도 맞지 않으면 layout_changed입니다.
+
+    Returns:
+        (state, detail)
+    """
+    from bs4 import BeautifulSoup
+
+    signature = SIGNATURES[site]
+    soup = BeautifulSoup(html, "html.parser")
+    found = {}
+    for selector in _all_selectors(signature):
+        try:
+            found[selector] = soup.select_one(selector) is not None
+        except Exception:  # soupsieve가 지원하지 않는 선택자
+            found[selector] = False
+    title = soup.title.get_text() if soup.title else ""
+    body = soup.body.get_text(" ") if soup.body else soup.get_text(" ")
+    state, detail = _match(signature, found, title + "\n" + body[:20000], url)
+    if state is None:
+        state, detail = LAYOUT_CHANGED, "no known element"
+    metrics.incr("page_state", site=site, state=state)
+    return state, detail
+
+
+def _match(signature, found, text, url):
+    """ 선택자/URL → 본문 텍스트 순으로 시그니처를 비교해 (state, detail)을 반환 (없으면 (None, "")) """
+    text = text.lower()
+    url = url.lower()
+    for state in CHECK_ORDER:
+        rules = signature.get(state, {})
+        for selector in rules.get("selectors", []):
+            if found.get(selector):
+                return state, selector
+        for marker in rules.get("urls", []):
+            if marker.lower() in url:
+                return state, f"url:{marker}"
+    for state in CHECK_ORDER:
+        for marker in signature.get(state, {}).get("texts", []):
+            if marker.lower() in text:
+                return state, marker
+    return None, ""
+
+
+def wait_for_state(driver, site, timeout=15, poll_interval=0.25, raise_on_error=True):
+    """
+    분류 결과가 나올 때까지 짧게 폴링합니다.
+    captcha/blocked/empty는 시그니처가 보이는 즉시 반환하고,
+    timeout이 지나도 아는 요소가 없으면 layout_changed로 봅니다.
+
+    Returns:
+        str: 상태 (raise_on_error=False일 때만 ok 이외의 값이 반환됨)
+
+    Raises:
+        PageStateError: 상태가 ok가 아닐 때 (raise_on_error=True)
+    """
+    started = time.monotonic()
+    state, detail = None, ""
+    with metrics.timer("page_state_wait", site=site):
+        while True:
+            try:
+                state, detail, _ = classify(driver, site)
+            except Exception as e:  # 페이지 전환 중 스크립트 실행 실패 등은 다음 폴링에서 다시 확인
+                state, detail = None, str(e)
+            if state:
+                break
+            if time.monotonic() - started >= timeout:
+                state, detail = LAYOUT_CHANGED, f"timeout {timeout}s"
+                break
+            time.sleep(poll_interval)
+    metrics.incr("page_state", site=site, state=state)
+    if state != OK and raise_on_error:
+        try:
+            url = driver.current_url
+        except Exception:
+            url = ""
+        raise PageStateError(state, site, url, detail)
+    return state
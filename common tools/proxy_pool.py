@@ -0,0 +1,246 @@
+"""
+프록시 풀: 호스트별 상태 점수로 프록시를 고르고, 차단/실패한 프록시는 격리했다가 자동 복귀시킵니다.
+
+프록시마다, 그리고 대상 호스트(search.naver.com, www.agoda.com ...)마다 따로
+    - 성공률 EWMA (1.0 = 항상 성공)
+    - 응답 시간 EWMA (초)
+    - 연속 실패 횟수, 차단 횟수
+를 기록합니다. 같은 프록시라도 Naver에서는 차단되고 Agoda에서는 멀쩡할 수 있기 때문입니다.
+
+선택: 격리되지 않은 프록시 중 무작위로 두 개를 뽑아 점수(성공률 / 응답 시간)가 높은 쪽을 사용
+      (power of two choices — 가장 빠른 프록시 하나에 요청이 몰리지 않음).
+      아직 응답 시간을 측정하지 않은 프록시가 우선입니다.
+격리: 403/429/캡차 응답이면 즉시, 연결 실패나 5xx가 MAX_CONSECUTIVE_FAILURES번 이어지면
+      BASE_QUARANTINE * 2^(격리 횟수) 초 동안 제외 (최대 MAX_QUARANTINE).
+      404, 416 등 그 밖의 4xx는 대상 서버의 응답이므로 프록시 성공으로 셉니다.
+복귀: 격리 시간이 지나면 성공률 0.5로 다시 후보가 됨
+
+설정 (환경 변수):
+    SCRAPING_PROXIES=http://user:pw@1.2.3.4:8080,http://5.6.7.8:3128
+    SCRAPING_PROXY_FILE=proxies.txt   (한 줄에 하나, #은 주석)
+둘 다 없으면 풀이 비어 있고 choose()는 None(직접 연결)을 반환하므로 기존 동작과 같습니다.
+
+사용 예:
+    import proxy_pool
+
+    response = proxy_pool.get(url, headers=headers, timeout=10)   # requests 기반 수집기
+
+    proxy = proxy_pool.default_pool().choose("www.agoda.com")     # Selenium
+    if proxy:
+        options.add_argument(proxy_pool.chrome_argument(proxy))
+    ...
+    proxy_pool.default_pool().report(proxy, "www.agoda.com", ok=True, latency=3.2)
+"""
+
+import logging
+import os
+import random
+import threading
+import time
+from urllib.parse import urlsplit
+
+import metrics
+
+EWMA_ALPHA = 0.3
+MAX_CONSECUTIVE_FAILURES = 3
+BASE_QUARANTINE = 60
+MAX_QUARANTINE = 60 * 60
+BAN_STATUS_CODES = (403, 429)
+CAPTCHA_MARKERS = ("captcha", "/sorry/", "challenge")
+
+
+class ProxyStats:
+    """ 프록시 하나의 호스트별 상태 """
+
+    def __init__(self):
+        self.success = 1.0
+        self.latency = None
+        self.consecutive_failures = 0
+        self.quarantines = 0
+        self.quarantined_until = 0.0
+
+    def score(self):
+        if self.latency is None:
+            return float("inf")  # 아직 측정하지 않은 프록시를 먼저 한 번 써 봄
+        return self.success / max(self.latency, 0.001)
+
+    def to_dict(self):
+        return {
+            "success": round(self.success, 3),
+            "latency": round(self.latency, 3) if self.latency is not None else None,
+            "consecutive_failures": self.consecutive_failures,
+            "quarantines": self.quarantines,
+            "quarantined_until": self.quarantined_until,
+        }
+
+
+class ProxyPool:
+    def __init__(self, proxies=(), clock=time.monotonic):
+        self.proxies = list(dict.fromkeys(p.strip() for p in proxies if p.strip()))
+        self.clock = clock
+        self._stats = {}  # (proxy, host) -> ProxyStats
+        self._lock = threading.Lock()
+
+    def __bool__(self):
+        return bool(self.proxies)
+
+    def _get_stats(self, proxy, host):
+        key = (proxy, host)
+        if key not in self._stats:
+            self._stats[key] = ProxyStats()
+        return self._stats[key]
+
+    def available(self, host):
+        """ 지금 host에 쓸 수 있는(격리되지 않은) 프록시 목록. 격리가 끝난 프록시는 여기서 복귀 """
+        now = self.clock()
+        result = []
+        with self._lock:
+            for proxy in self.proxies:
+                stats = self._get_stats(proxy, host)
+                if stats.quarantined_until and stats.quarantined_until <= now:
+                    stats.quarantined_until = 0.0
+                    stats.success = 0.5  # 복귀 직후에는 검증된 프록시보다 낮은 점수로 시작
+                    stats.consecutive_failures = 0
+                    logging.info(f"프록시 복귀: {proxy} ({host})")
+                if not stats.quarantined_until:
+                    result.append(proxy)
+        return result
+
+    def choose(self, host):
+        """
+        host에 사용할 프록시를 반환합니다. 풀이 비어 있으면 None (직접 연결).
+        모두 격리 중이면 가장 먼저 풀리는 프록시를 반환합니다.
+        """
+        if not self.proxies:
+            return None
+        candidates = self.available(host)
+        metrics.set_gauge("proxy_available", len(candidates), host=host)
+        with self._lock:
+            if not candidates:
+                proxy = min(self.proxies, key=lambda p: self._get_stats(p, host).quarantined_until)
+                logging.warning(f"{host}: 사용 가능한 프록시가 없어 격리 중인 {proxy} 사용")
+                return proxy
+            if len(candidates) == 1:
+                return candidates[0]
+            first, second = random.sample(candidates, 2)
+            if self._get_stats(first, host).score() >= self._get_stats(second, host).score():
+                return first
+            return second
+
+    def report(self, proxy, host, ok, latency=None, banned=False):
+        """
+        요청 결과를 기록합니다.
+
+        Args:
+            ok (bool): 원하는 응답을 받았는지
+            latency (float): 응답 시간 (초)
+            banned (bool): 403/429/캡차 등 차단 신호 — 즉시 격리
+        """
+        if proxy is None:
+            return
+        outcome = "ok" if ok else ("banned" if banned else "failure")
+        metrics.incr("proxy_requests", host=host, outcome=outcome)
+        with self._lock:
+            stats = self._get_stats(proxy, host)
+            stats.success = (1 - EWMA_ALPHA) * stats.success + EWMA_ALPHA * (1.0 if ok else 0.0)
+            if latency is not None:
+                stats.latency = latency if stats.latency is None else \
+                    (1 - EWMA_ALPHA) * stats.latency + EWMA_ALPHA * latency
+            if ok:
+                stats.consecutive_failures = 0
+                return
+            stats.consecutive_failures += 1
+            if banned or stats.consecutive_failures >= MAX_CONSECUTIVE_FAILURES:
+                duration = min(BASE_QUARANTINE * 2 ** stats.quarantines, MAX_QUARANTINE)
+                stats.quarantines += 1
+                stats.quarantined_until = self.clock() + duration
+                metrics.incr("proxy_quarantines", host=host, reason=outcome)
+                logging.warning(f"프록시 격리 {duration}초: {proxy} ({host}, {outcome})")
+
+    def stats(self, host=None):
+        """ {프록시: {호스트: 상태}} (host를 주면 해당 호스트만) """
+        with self._lock:
+            result = {}
+            for (proxy, stats_host), stats in self._stats.items():
+                if host is None or stats_host == host:
+                    result.setdefault(proxy, {})[stats_host] = stats.to_dict()
+            return result
+
+
+def requests_proxies(proxy):
+    """ requests의 proxies 인자 형식 (None이면 직접 연결) """
+    return {"http": proxy, "https": proxy} if proxy else None
+
+
+def chrome_argument(proxy):
+    """
+    Chrome --proxy-server 인자. Chrome은 이 인자로 인증 정보를 받지 않으므로
+    user:pw@ 부분은 제거됩니다 (Selenium에는 IP 인증 프록시를 사용).
+    """
+    parts = urlsplit(proxy if "://" in proxy else "http://" + proxy)
+    return f"--proxy-server={parts.scheme}://{parts.hostname}:{parts.port}"
+
+
+def is_ban_response(response):
+    """ 차단/속도 제한으로 보이는 응답인지 (상태 코드, 캡차 페이지로의 리다이렉트) """
+    if response.status_code in BAN_STATUS_CODES:
+        return True
+    return any(marker in response.url.lower() for marker in CAPTCHA_MARKERS)
+
+
+def is_proxy_success(response):
+    """
+    응답이 프록시의 정상 동작을 보여 주는지. 404나 이어받기 완료를 뜻하는 416 같은 4xx는
+    대상 서버의 응답이므로 프록시 성공으로 보고, 차단 응답과 5xx만 프록시 실패로 셉니다.
+    """
+    return not is_ban_response(response) and response.status_code < 500
+
+
+def load_proxies_from_env():
+    proxies = [p for p in os.environ.get("SCRAPING_PROXIES", "").split(",") if p.strip()]
+    path = os.environ.get("SCRAPING_PROXY_FILE")
+    if path:
+        with open(path, "r", encoding="utf-8") as f:
+            proxies += [line.strip() for line in f if line.strip() and not line.strip().startswith("#")]
+    return proxies
+
+
+_default_pool = None
+_default_pool_lock = threading.Lock()
+
+
+def default_pool():
+    """ 환경 변수로 설정된 프로세스 공용 풀 (처음 호출할 때 생성) """
+    global _default_pool
+    with _default_pool_lock:
+        if _default_pool is None:
+            _default_pool = ProxyPool(load_proxies_from_env())
+            if _default_pool:
+                logging.info(f"프록시 풀: {len(_default_pool.proxies)}개")
+        return _default_pool
+
+
+def get(url, pool=None, session=None, **kwargs):
+    """
+    requests.get()과 같지만 풀에서 고른 프록시를 사용하고 결과를 풀에 기록합니다.
+    연결 오류, 차단 응답, 5xx만 프록시 실패로 기록합니다 (is_proxy_success).
+    풀이 비어 있으면 그냥 직접 요청합니다.
+    """
+    import requests
+
+    pool = pool if pool is not None else default_pool()
+    host = urlsplit(url).hostname or ""
+    proxy = pool.choose(host)
+    if proxy:
+        kwargs["proxies"] = requests_proxies(proxy)
+    getter = session or requests
+    started = time.perf_counter()
+    try:
+        response = getter.get(url, **kwargs)
+    except requests.RequestException:
+        pool.report(proxy, host, ok=False, latency=time.perf_counter() - started)
+        raise
+    banned = is_ban_response(response)
+    pool.report(proxy, host, ok=is_proxy_success(response),
+                latency=time.perf_counter() - started, banned=banned)
+    return response
@@ -1,4 +1,4 @@
-import requests
+from urllib.parse import urlsplit
 from bs4 import BeautifulSoup
 from fake_useragent import UserAgent
 import time
@@ -6,6 +6,12 @@ import random
 from datetime import datetime
 import json
 import logging
+import os
+import sys
+
+# 공용 모듈(common tools) 경로 추가
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "common tools"))
+import proxy_pool
 
 # 로깅 설정: 성공 및 실패 로그 기록
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -25,7 +31,7 @@ def scrape_with_requests(url, max_retries=3):
             headers = {'User-Agent': ua.random}
             logging.info(f"Request attempt {attempt} using User-Agent: {headers['User-Agent']}")
             
-            response = requests.get(url, headers=headers, timeout=10)
+            response = proxy_pool.get(url, headers=headers, timeout=10)  # SCRAPING_PROXIES가 있으면 프록시 사용
             if response.status_code != 200:
                 error_msg = f"HTTP Error {response.status_code}"
                 logging.error(f"Attempt {attempt}: {error_msg}")
@@ -93,6 +99,9 @@ def scrape_with_selenium(url):
       <span class="info_txt"> 태그 내 "한국" 텍스트를 포함하는 조상 <li class="info_box"> 요소 내의
       <strong class="title"> 태그에서 영화 제목을 추출
     """
+    host = urlsplit(url).hostname
+    proxy = None
+    started = time.perf_counter()
     try:
         from selenium import webdriver
         from selenium.webdriver.chrome.options import Options
@@ -103,6 +112,9 @@ def scrape_with_selenium(url):
         chrome_options = Options()
         chrome_options.add_argument("--headless")
         chrome_options.add_argument(f"user-agent={UserAgent().random}")
+        proxy = proxy_pool.default_pool().choose(host)
+        if proxy:
+            chrome_options.add_argument(proxy_pool.chrome_argument(proxy))
         
         driver = webdriver.Chrome(options=chrome_options)
         logging.info("Selenium driver started. Fetching the page...")
@@ -139,6 +151,7 @@ def scrape_with_selenium(url):
                 
                 if movie_title:
                     logging.info("Successfully scraped movie title using Selenium.")
+                    proxy_pool.default_pool().report(proxy, host, ok=True, latency=time.perf_counter() - started)
                     driver.quit()
                     return {
                         "movie_title": movie_title,
@@ -153,6 +166,7 @@ def scrape_with_selenium(url):
     
     except Exception as e:
         logging.error("Selenium scraping failed: " + str(e))
+        proxy_pool.default_pool().report(proxy, host, ok=False, latency=time.perf_counter() - started)
         return {
             "movie_title": None,
             "scraping_timestamp": datetime.now().isoformat(),
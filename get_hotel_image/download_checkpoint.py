@@ -0,0 +1,137 @@
+"""
+Per-hotel download checkpoint for the Naver image stage.
+
+Each hotel folder keeps a `.checkpoint.json` listing the source URLs that
+were already saved and verified, with the file path and SHA-256 of each.
+A re-run after a crash or network drop skips those URLs and only does the
+remaining work. Partial downloads live next to them as `<url-hash>.tmp`
+and are resumed with an HTTP Range request (see download_image); stale
+ones are removed by cleanup_tmp().
+
+Paths are stored relative to the checkpoint's folder, so the checkpoint
+stays valid whatever directory the script is started from. A checkpoint
+written for a different search_url (a reused folder index) is discarded
+instead of resumed.
+
+Layout:
+    <save_dir>/.checkpoint.json   {"search_url", "updated_at", "images": [{"url", "path", "sha256", "saved_at"}]}
+                                  ("path" is relative to <save_dir>)
+    <save_dir>/<url-hash>.tmp     partial download
+    <save_dir>/naver_image_*.jpg  finished images
+"""
+
+import hashlib
+import json
+import logging
+import os
+import time
+
+CHECKPOINT_NAME = ".checkpoint.json"
+TMP_SUFFIX = ".tmp"
+STALE_TMP_SECONDS = 24 * 60 * 60
+
+
+def url_key(url):
+    """ Stable short name for a source URL (used for its .tmp file). """
+    return hashlib.sha1(url.encode("utf-8")).hexdigest()[:16]
+
+
+def tmp_path_for(save_dir, url):
+    return os.path.join(save_dir, url_key(url) + TMP_SUFFIX)
+
+
+def file_sha256(path, chunk_size=64 * 1024):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class DownloadCheckpoint:
+    def __init__(self, save_dir, search_url=None):
+        self.save_dir = save_dir
+        self.path = os.path.join(save_dir, CHECKPOINT_NAME)
+        self.data = {"search_url": search_url, "images": []}
+        if os.path.exists(self.path):
+            try:
+                with open(self.path, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+                if search_url and data.get("search_url") and data["search_url"] != search_url:
+                    # 같은 폴더 번호를 다른 검색에 다시 쓴 경우: 다른 호텔의 이미지로 이어받지 않음
+                    logging.warning(f"검색 URL이 달라 체크포인트를 새로 시작: {self.path}")
+                else:
+                    self.data = data
+                    self.data["search_url"] = search_url or data.get("search_url")
+            except (OSError, ValueError) as e:
+                logging.warning(f"체크포인트를 읽지 못해 새로 시작: {self.path} ({e})")
+        self._drop_missing()
+
+    def _abs_path(self, path):
+        """ 저장된 경로(폴더 기준 상대 경로)를 실제 경로로 변환 """
+        if os.path.isabs(path):
+            return path
+        resolved = os.path.join(self.save_dir, path)
+        if not os.path.exists(resolved):
+            # 예전 체크포인트는 실행 위치 기준 경로를 저장했음: 폴더 안의 같은 파일 이름으로 찾음
+            resolved = os.path.join(self.save_dir, os.path.basename(path))
+        return resolved
+
+    def _drop_missing(self):
+        """ 체크포인트에는 있지만 파일이 지워졌거나 내용이 바뀐 항목은 다시 받도록 제외 """
+        valid = []
+        for image in self.data.get("images", []):
+            path = self._abs_path(image["path"])
+            if os.path.exists(path) and file_sha256(path) == image["sha256"]:
+                image["path"] = os.path.relpath(path, self.save_dir)
+                valid.append(image)
+            else:
+                logging.warning(f"체크포인트 항목 무효 (파일 없음/해시 불일치): {image['path']}")
+        self.data["images"] = valid
+
+    def _save(self):
+        os.makedirs(self.save_dir, exist_ok=True)
+        self.data["updated_at"] = time.strftime("%Y-%m-%d %H:%M:%S")
+        tmp_path = self.path + ".write"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.data, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, self.path)  # 원자적 교체로 중간 상태 파일이 남지 않도록 함
+
+    def is_done(self, url):
+        return any(image["url"] == url for image in self.data["images"])
+
+    def saved_paths(self):
+        return [os.path.join(self.save_dir, image["path"]) for image in self.data["images"]]
+
+    def record(self, url, path):
+        """ Records a saved and verified image; written to disk immediately. """
+        self.data["images"].append({
+            "url": url,
+            "path": os.path.relpath(path, self.save_dir),
+            "sha256": file_sha256(path),
+            "saved_at": time.strftime("%Y-%m-%d %H:%M:%S"),
+        })
+        self._save()
+
+    def cleanup_tmp(self, keep_urls=(), max_age=STALE_TMP_SECONDS):
+        """
+        Removes partial downloads that will not be resumed: those of URLs
+        already completed, and those older than max_age. Partial files of
+        keep_urls are always kept.
+        """
+        if not os.path.isdir(self.save_dir):
+            return 0
+        keep = {url_key(url) + TMP_SUFFIX for url in keep_urls}
+        done = {url_key(image["url"]) + TMP_SUFFIX for image in self.data["images"]}
+        removed = 0
+        now = time.time()
+        for name in os.listdir(self.save_dir):
+            if not name.endswith(TMP_SUFFIX) or name in keep:
+                continue
+            path = os.path.join(self.save_dir, name)
+            if name in done or now - os.path.getmtime(path) > max_age:
+                os.remove(path)
+                removed += 1
+        if removed:
+            logging.info(f"남은 임시 파일 {removed}개 삭제: {self.save_dir}")
+        return removed
@@ -19,42 +19,57 @@ Process:
     1. Prompt user for Google Sheets integration info.
     2. Read the index (cell A1) and query string (cell A2) from the sheet named '베트남호텔'.
     3. Build the search URL using the query string (e.g., "나트랑 버고호텔" => "&query=나트랑+버고호텔").
-    4. Download a specified number of images (default 4) by randomly selecting containers.
+    4. Read the result tiles (original URL and size) without a browser from
+       Naver's paging JSON endpoint or the search page HTML (naver_image_api).
+       Tiles without a known size are probed with a small Range request (header
+       only); all are ranked by resolution/aspect ratio and the best ones
+       (default 4) are downloaded. Chrome starts only as a fallback when that
+       yields too few images, and clicks random containers as a last resort.
        The images are saved in a folder named with the index (e.g., "../../Dropbox/down/1").
     5. Log all steps, errors, and downloaded file paths.
 """
 
 import os
+import sys
 import time
 import logging
 import random
 import requests
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from urllib.parse import urlsplit
 from fake_useragent import UserAgent
-from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import TimeoutException, WebDriverException
-from PIL import Image
 from requests.exceptions import ConnectionError as ReqConnectionError
 
-# For Google Sheets integration
-import gspread
-from google.oauth2.service_account import Credentials
+# selenium, PIL, gspread, google-auth는 import 비용이 커서 실제로 사용하는 함수 안에서 import합니다.
+# (dry run이나 --help에서는 로드되지 않음)
 
-# Configure logging to file
-logging.basicConfig(
-    filename='./download.log',
-    encoding='utf-8',
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s'
-)
+# 공용 모듈(common tools) 경로 추가
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "common tools"))
+import metrics
+import proxy_pool
+import adaptive_concurrency
+from diagnostics import DiagnosticsRecorder
+import image_probe
+import naver_image_api
+import page_state
+from page_state import PageStateError
+from download_checkpoint import DownloadCheckpoint, tmp_path_for, url_key
+
+
+def configure_logging():
+    """ Configure logging to file (import 시점이 아니라 실행 시점에 설정) """
+    logging.basicConfig(
+        filename='./download.log',
+        encoding='utf-8',
+        level=logging.INFO,
+        format='%(asctime)s - %(levelname)s - %(message)s'
+    )
 
 
 # 기본 네이버 이미지 검색 URL (QUERY 파라미터 제외)
 BASE_SEARCH_URL = "https://search.naver.com/search.naver?ssc=tab.image.all&where=image&sm=tab_jum"
+SEARCH_HOST = "search.naver.com"
 
 def get_gsheet_config():
     """
@@ -86,6 +101,9 @@ def get_query_from_gsheet(credentials_json, spreadsheet_id):
         - index_value: 해당 행 번호 (int). 예: 2 -> 스프레드시트의 2행
         - worksheet: gspread Worksheet 객체
     """
+    import gspread
+    from google.oauth2.service_account import Credentials
+
     scopes = ["https://www.googleapis.com/auth/spreadsheets"]
     credentials = Credentials.from_service_account_file(credentials_json, scopes=scopes)
     client = gspread.authorize(credentials)
@@ -124,6 +142,7 @@ def build_search_url(query):
     formatted_query = query.replace(" ", "+")
     return f"{BASE_SEARCH_URL}&query={formatted_query}"
 
+@metrics.timed()
 def safe_driver_get(driver, url, retries=3, delay=60):
     """
     Attempts to load the URL with Selenium driver.
@@ -146,10 +165,13 @@ def safe_driver_get(driver, url, retries=3, delay=60):
             return True
         except Exception as e:
             attempts += 1
+            metrics.incr("driver_get_failures")
             logging.error(f"네트워크 연결 실패, {delay}초 대기 후 재시도 ({attempts}/{retries}): {str(e)}")
-            time.sleep(delay)
+            with metrics.timer("sleep", reason="driver_get_retry"):
+                time.sleep(delay)
     return False
 
+@metrics.timed("chrome_startup")
 def setup_driver():
     """
     Sets up a headless ChromeDriver with a randomized User-Agent.
@@ -157,43 +179,60 @@ def setup_driver():
     Returns:
         webdriver.Chrome: Configured Selenium WebDriver.
     """
+    from selenium import webdriver
+    from selenium.webdriver.chrome.options import Options
+    from selenium.common.exceptions import WebDriverException
+
     chrome_options = Options()
     chrome_options.add_argument("--headless")
     ua = UserAgent()
     user_agent = ua.random
     chrome_options.add_argument(f'user-agent={user_agent}')
+    proxy = proxy_pool.default_pool().choose(SEARCH_HOST)
+    if proxy:
+        chrome_options.add_argument(proxy_pool.chrome_argument(proxy))
     try:
         driver = webdriver.Chrome(options=chrome_options)
     except WebDriverException as e:
         logging.error(f"ChromeDriver 초기화 에러: {str(e)}")
         raise
+    driver.proxy_url = proxy  # 결과를 프록시 풀에 보고할 때 사용
     return driver
 
-def get_actual_image_url(driver, search_url, image_index=2):
+@metrics.timed()
+def get_actual_image_url(driver, search_url, image_index=2, diagnostics=None):
+    """
+    Opens the search page, clicks the image tile at image_index and returns the
+    original image URL shown in the viewer.
+
+    Args:
+        diagnostics (DiagnosticsRecorder): 실패 시 스크린샷/HTML을 남길 수집기.
+            None이면 기본 설정(SCRAPING_DIAGNOSTICS 환경 변수)으로 생성합니다.
+
+    Raises:
+        PageStateError: 검색 페이지가 캡차/차단/결과 없음/레이아웃 변경으로 분류된 경우.
+            다른 타일을 골라 다시 시도해도 결과가 같으므로 호출한 쪽에서 중단합니다.
+    """
+    from selenium.webdriver.common.by import By
+    from selenium.webdriver.support.ui import WebDriverWait
+    from selenium.webdriver.support import expected_conditions as EC
+    from selenium.common.exceptions import TimeoutException
+
+    if diagnostics is None:
+        diagnostics = DiagnosticsRecorder()
+
     if not safe_driver_get(driver, search_url):
         logging.error("검색 페이지 로드 실패")
+        diagnostics.capture_failure(driver, "search_page_load_failed")
         return None
 
-    # 동적 컨텐츠 로드를 위해 대기
-    time.sleep(5)
-    
-    # 초기 페이지 스크린샷 저장
-    try:
-        driver.save_screenshot("debug_page.png")
-        logging.info("초기 페이지 스크린샷(debug_page.png) 저장됨.")
-    except Exception as e:
-        logging.error(f"초기 페이지 스크린샷 저장 실패: {str(e)}")
+    # 고정 대기 대신 타일이 나타나는 즉시 진행하고, 캡차/결과 없음 등은 바로 중단
+    logging.info("search section 1")
+    wait_for_search_page(driver, diagnostics)
+    logging.info("이미지 컨테이너 요소 로드됨.")
 
-    # 클릭할 이미지 컨테이너 로드 대기 및 검색
-    try:
-        logging.info("search section 1")
-        WebDriverWait(driver, 15).until(
-            EC.presence_of_element_located((By.CSS_SELECTOR, 'div[class*="mod_image_tile"] img'))
-        )
-        logging.info("이미지 컨테이너 요소 로드됨.")
-    except TimeoutException:
-        logging.error("이미지 컨테이너 요소 로드 대기 시간 초과")
-        return None
+    # 초기 페이지 DOM을 링 버퍼에 보관 (스크린샷은 실패 시에만 저장)
+    diagnostics.snapshot(driver, "search_page")
 
     try:
         logging.info("search section 2")
@@ -201,31 +240,30 @@ def get_actual_image_url(driver, search_url, image_index=2):
         logging.info(f"페이지에서 {len(div_elements)}개의 이미지 컨테이너 발견됨.")
         if len(div_elements) <= image_index:
             logging.error(f"요청한 인덱스({image_index})가 컨테이너 개수보다 큼.")
+            diagnostics.capture_failure(driver, f"image_index_out_of_range({image_index}/{len(div_elements)})")
             return None
         target_div = div_elements[image_index]
         target_div.click()
         logging.info(f"{image_index+1}번째 이미지 컨테이너 클릭 완료.")
     except Exception as e:
         logging.error(f"이미지 컨테이너 클릭 중 에러: {str(e)}")
+        diagnostics.capture_failure(driver, f"tile_click_error: {e}")
         return None
 
     # 상세보기 페이지 로드 대기: div.sc_new.sp_viewer
     try:
         logging.info("search section 3")
-        WebDriverWait(driver, 15).until(
-            EC.presence_of_element_located((By.CSS_SELECTOR, 'div[class="image _viewerImageBox"] img'))
-        )
+        with metrics.timer("webdriver_wait", target="viewer_image"):
+            WebDriverWait(driver, 15).until(
+                EC.presence_of_element_located((By.CSS_SELECTOR, 'div[class="image _viewerImageBox"] img'))
+            )
         logging.info("상세보기 컨테이너(div.sc_new.sp_viewer) 로드됨.")
     except TimeoutException:
         logging.error("상세보기 컨테이너(div.sc_new.sp_viewer) 로드 대기 시간 초과")
+        diagnostics.capture_failure(driver, "viewer_timeout")
         return None
 
-    # 상세보기 페이지 스크린샷 저장
-    try:
-        driver.save_screenshot("debug_detailed_page.png")
-        logging.info("상세보기 페이지 스크린샷(debug_detailed_page.png) 저장됨.")
-    except Exception as e:
-        logging.error(f"상세보기 페이지 스크린샷 저장 실패: {str(e)}")
+    diagnostics.snapshot(driver, "detail_page")
     
     # 단계별 태그 탐색: 상세보기 컨테이너 내에서 이미지 태그 찾기
     try:
@@ -235,6 +273,7 @@ def get_actual_image_url(driver, search_url, image_index=2):
             logging.info("단계 1: div.sc_new.sp_viewer 요소 발견.")
         except Exception as e:
             logging.error("단계 1: div.sc_new.sp_viewer 요소 탐색 실패")
+            diagnostics.capture_failure(driver, "viewer_box_missing")
             return None
  
         # 단계 4: div.image 내부의 <img> 태그 찾기
@@ -243,25 +282,80 @@ def get_actual_image_url(driver, search_url, image_index=2):
             logging.info("단계 2: <img> 태그 발견.")
         except Exception as e:
             logging.error("단계 2: <img> 태그 탐색 실패")
+            diagnostics.capture_failure(driver, "viewer_img_missing")
             return None
 
         # 단계 5: <img> 태그의 src 속성 추출
         detailed_image_url = img_element.get_attribute('src')
         if not detailed_image_url:
             logging.error("단계 5: <img> 태그에서 src 속성 추출 실패")
+            diagnostics.capture_failure(driver, "viewer_img_src_empty")
             return None
         logging.info(f"추출한 상세 이미지 URL: {detailed_image_url}")
         return detailed_image_url
 
     except Exception as e:
         logging.error(f"상세 이미지 URL 추출 중 전반적 에러: {str(e)}")
+        diagnostics.capture_failure(driver, f"extract_error: {e}")
         return None
 
 
 
+def wait_for_search_page(driver, diagnostics=None):
+    """
+    Classifies the search page right after navigation (common tools/page_state.py).
+    Returns as soon as the result tiles are present; on a captcha, block,
+    empty result or unknown layout it records the failure and re-raises the
+    PageStateError so the caller can stop instead of waiting out timeouts.
+    """
+    try:
+        page_state.wait_for_state(driver, "naver_image")
+    except PageStateError as e:
+        logging.error(f"검색 페이지 상태 {e.state}: {e.detail}")
+        if diagnostics:
+            diagnostics.capture_failure(driver, f"page_state_{e.state}: {e.detail}")
+        raise
+
+
+# 검색 결과 타일의 썸네일 src와 원본 주소(data-original)를 한 번의 JavaScript 호출로 수집
+TILE_SCRIPT = """
+return Array.from(document.querySelectorAll('div[class*="mod_image_tile"] img')).map(function (img) {
+    return {src: img.getAttribute('src') || img.getAttribute('data-lazy-src'),
+            original: img.getAttribute('data-original') || img.getAttribute('data-source')};
+});
+"""
+
+
+@metrics.timed()
+def collect_candidate_urls(driver, search_url, diagnostics=None):
+    """
+    Loads the search page once and returns the original image URLs of the
+    result tiles, without opening the viewer for each one.
+
+    Returns:
+        list: original image URLs in page order (empty if none could be derived).
+
+    Raises:
+        PageStateError: the search page is not a normal result page.
+    """
+    if not safe_driver_get(driver, search_url):
+        logging.error("검색 페이지 로드 실패")
+        return []
+    wait_for_search_page(driver, diagnostics)
+    tiles = driver.execute_script(TILE_SCRIPT) or []
+    urls = image_probe.candidate_urls_from_tiles(tiles, base_url=driver.current_url)
+    logging.info(f"타일 {len(tiles)}개 중 원본 주소 {len(urls)}개 확보")
+    return urls
+
+
+@metrics.timed()
 def download_image(url, save_dir, max_retries=3):
     """
     Downloads an image from the given URL with multiple retries and validates its integrity.
+    The body is streamed into `<url-hash>.tmp` first; if that file is left over
+    from an interrupted attempt (or run), the download resumes from its size with
+    an HTTP Range request. Only a verified image is renamed to its final name,
+    `naver_image_<url-hash>.jpg`, so parallel downloads never share a file.
     
     Args:
         url (str): URL of the image.
@@ -271,48 +365,110 @@ def download_image(url, save_dir, max_retries=3):
     Returns:
         str or None: File path of the downloaded image if successful; otherwise, None.
     """
+    from PIL import Image
+
     if not os.path.exists(save_dir):
         os.makedirs(save_dir)
     
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    filename = f"naver_image_{timestamp}.jpg"
+    # 파일명은 URL 해시로 정함 (download_ranked가 병렬로 호출하므로 시각 기반 이름은 충돌할 수 있음)
+    filename = f"naver_image_{url_key(url)}.jpg"
     filepath = os.path.join(save_dir, filename)
+    tmp_path = tmp_path_for(save_dir, url)
+    host = urlsplit(url).hostname or ""
+    limiter = adaptive_concurrency.default_limiter()
     
     ua = UserAgent()
     headers = {"User-Agent": ua.random}
     
     for attempt in range(1, max_retries + 1):
         try:
-            response = requests.get(url, headers=headers, timeout=10)
-            if response.status_code == 200:
-                with open(filepath, 'wb') as f:
-                    f.write(response.content)
-                if os.path.getsize(filepath) == 0:
-                    raise Exception("다운로드한 파일이 비어 있음")
-                try:
-                    with Image.open(filepath) as img:
-                        img.verify()
-                except Exception as img_err:
-                    raise Exception(f"이미지 무결성 검사 실패: {str(img_err)}")
-                logging.info(f"이미지 다운로드 성공: {url}")
-                return filepath
-            else:
-                raise Exception(f"HTTP 상태 코드 {response.status_code}")
+            offset = os.path.getsize(tmp_path) if os.path.exists(tmp_path) else 0
+            request_headers = dict(headers)
+            if offset:
+                request_headers["Range"] = f"bytes={offset}-"
+            transferred = 0
+            # 이미지 호스트별 동시 요청 수는 AIMD 제한기가 429/403/응답 지연을 보고 조정
+            with metrics.timer("image_transfer"), limiter.acquire(host) as slot:
+                started = time.perf_counter()
+                with proxy_pool.get(url, headers=request_headers, timeout=10, stream=True) as response:
+                    slot.record_response(response, time.perf_counter() - started)
+                    if response.status_code == 206 and offset:
+                        mode = 'ab'  # 이어받기
+                        metrics.incr("image_resumed_bytes", offset)
+                        logging.info(f"{offset} 바이트부터 이어받기: {url}")
+                    elif response.status_code == 200:
+                        mode = 'wb'  # Range를 지원하지 않으면 처음부터
+                    elif response.status_code == 416 and offset:
+                        mode = None  # 임시 파일에 이미 전체가 받아져 있음
+                    else:
+                        raise Exception(f"HTTP 상태 코드 {response.status_code}")
+                    if mode:
+                        with open(tmp_path, mode) as f:
+                            for chunk in response.iter_content(chunk_size=64 * 1024):
+                                f.write(chunk)
+                                transferred += len(chunk)
+            if os.path.getsize(tmp_path) == 0:
+                raise Exception("다운로드한 파일이 비어 있음")
+            try:
+                with metrics.timer("image_verify"), Image.open(tmp_path) as img:
+                    img.verify()
+            except Exception as img_err:
+                os.remove(tmp_path)  # 손상된 임시 파일은 이어받지 않고 다음 시도에서 처음부터
+                raise Exception(f"이미지 무결성 검사 실패: {str(img_err)}")
+            os.replace(tmp_path, filepath)
+            metrics.incr("image_bytes", transferred)
+            logging.info(f"이미지 다운로드 성공: {url}")
+            return filepath
         except Exception as e:
             logging.error(f"다운로드 시도 {attempt}회 실패: {str(e)}")
+            metrics.incr("image_download_failures")
             # 연결 오류일 경우 60초 대기, 그 외는 2초 대기
-            if isinstance(e, ReqConnectionError):
-                time.sleep(60)
-            else:
-                time.sleep(2)
+            with metrics.timer("sleep", reason="download_retry"):
+                if isinstance(e, ReqConnectionError):
+                    time.sleep(60)
+                else:
+                    time.sleep(2)
     
     logging.error("최대 재시도 횟수 후에도 이미지 다운로드 실패")
     return None
 
+def download_ranked(ranked, save_dir, checkpoint, downloaded_filepaths, num_images):
+    """
+    Downloads the ranked candidates best first, in parallel, until
+    downloaded_filepaths holds num_images files; a failed download is
+    replaced by the next candidate. Appends to downloaded_filepaths.
+    """
+    # 부족한 장수만큼 상위 후보를 병렬로 받고, 실패하면 다음 후보로 채움.
+    # 실제 동시 요청 수는 download_image 안의 호스트별 AIMD 제한기가 정함.
+    with ThreadPoolExecutor(max_workers=max(num_images, 1)) as pool:
+        while ranked and len(downloaded_filepaths) < num_images:
+            need = num_images - len(downloaded_filepaths)
+            batch, ranked = ranked[:need], ranked[need:]
+            saved_paths = pool.map(lambda probe: download_image(probe["url"], save_dir=save_dir), batch)
+            for probe, saved_path in zip(batch, saved_paths):
+                if saved_path:
+                    logging.info(f"이미지 저장 완료 ({probe['width']}x{probe['height']}): {saved_path}")
+                    checkpoint.record(probe["url"], saved_path)  # 체크포인트 기록은 메인 스레드에서만
+                    downloaded_filepaths.append(saved_path)
+    return downloaded_filepaths
+
+
 def download_multiple_images(search_url, num_images=4, folder_index="default"):
     """
-    Downloads multiple images by randomly selecting image containers from the search results.
+    Downloads the best num_images images from the search results.
+    Tile metadata is first read without a browser (naver_image_api: the
+    paging JSON endpoint, then the search page HTML). Only when that yields
+    too few images does Chrome start, the same tier-then-fallback order as
+    drama_of_netflix.main().
+    Candidates are probed header-only (image_probe) unless their size is
+    already known, and ranked by resolution and aspect ratio; only the
+    winners are downloaded in full. If that yields too few images, the
+    remainder is filled by clicking random containers.
+    If the search page is classified as a captcha, block, empty result or
+    changed layout (page_state), the hotel is abandoned immediately.
     Saves the images in a folder named with the given folder_index.
+    Progress is checkpointed per image (download_checkpoint), so a re-run
+    keeps the images already saved and only downloads the remainder.
     
     Args:
         search_url (str): The complete search URL.
@@ -322,25 +478,82 @@ def download_multiple_images(search_url, num_images=4, folder_index="default"):
     Returns:
         list: List of file paths for the successfully downloaded images.
     """
-    driver = setup_driver()
-    downloaded_filepaths = []
-    used_indices = []
-    
     # 기본 저장 폴더를 folder_index 하위로 지정
     base_save_dir = os.path.join("../../Dropbox/Dropbox/automation material/downloaded_images", folder_index)
-    
-    for i in range(num_images):
+
+    # 이전 실행에서 저장·검증된 이미지는 다시 받지 않음
+    checkpoint = DownloadCheckpoint(base_save_dir, search_url=search_url)
+    downloaded_filepaths = checkpoint.saved_paths()
+    if downloaded_filepaths:
+        logging.info(f"체크포인트에서 {len(downloaded_filepaths)}장 확인: {base_save_dir}")
+    if len(downloaded_filepaths) >= num_images:
+        checkpoint.cleanup_tmp()
+        return downloaded_filepaths[:num_images]
+
+    # 기본 방식: 브라우저 없이 타일 정보(원본 주소, 크기)를 HTTP 요청 한두 번으로 가져옴
+    headers = {"User-Agent": UserAgent().random}
+    try:
+        tiles = naver_image_api.fetch_tiles(search_url, headers=headers)
+    except PageStateError as e:
+        # 결과 없음/캡차/차단은 Chrome으로 다시 열어도 같으므로 백업 방식으로 넘어가지 않음
+        logging.error(f"검색 페이지가 {e.state} 상태라 이 호텔을 건너뜀 ({e.detail}): {search_url}")
+        return downloaded_filepaths
+    candidate_urls = [tile["url"] for tile in tiles if not checkpoint.is_done(tile["url"])]
+    if candidate_urls:
+        ranked = image_probe.rank_candidates(naver_image_api.candidates_from_tiles(
+            [tile for tile in tiles if tile["url"] in candidate_urls], headers=headers
+        ))
+        logging.info(f"기본 방식: 후보 {len(candidate_urls)}개 중 사용 가능한 이미지 {len(ranked)}개")
+        download_ranked(ranked, base_save_dir, checkpoint, downloaded_filepaths, num_images)
+    if len(downloaded_filepaths) >= num_images:
+        checkpoint.cleanup_tmp(keep_urls=candidate_urls)
+        return downloaded_filepaths
+
+    # 기본 방식으로 부족하면 Selenium 백업 방식으로 전환
+    logging.info(f"기본 방식으로 {len(downloaded_filepaths)}/{num_images}장 확보, Selenium 백업 방식으로 전환")
+    from selenium.webdriver.common.by import By
+
+    driver = setup_driver()
+    diagnostics = DiagnosticsRecorder(hotel=folder_index)
+    used_indices = []
+    tried_urls = set(candidate_urls)
+
+    # 1단계: 타일의 원본 주소를 헤더만 확인해 순위를 매기고 상위 후보만 전체 다운로드
+    started = time.perf_counter()
+    dead_page = None
+    try:
+        tile_urls = collect_candidate_urls(driver, search_url, diagnostics)
+    except PageStateError as e:
+        dead_page, tile_urls = e, []
+    # 결과 없음은 프록시 문제가 아니므로 성공으로 기록
+    proxy_ok = bool(tile_urls) or bool(dead_page and dead_page.state == page_state.EMPTY)
+    proxy_pool.default_pool().report(driver.proxy_url, SEARCH_HOST, ok=proxy_ok,
+                                     latency=time.perf_counter() - started,
+                                     banned=bool(dead_page and dead_page.is_ban))
+    if dead_page:
+        # 타일을 클릭하는 2단계도 같은 페이지를 보게 되므로 시도하지 않음
+        logging.error(f"검색 페이지가 {dead_page.state} 상태라 이 호텔을 건너뜀: {search_url}")
+        driver.quit()
+        checkpoint.cleanup_tmp(keep_urls=candidate_urls)
+        return downloaded_filepaths
+    # 기본 방식에서 이미 시도한 주소는 다시 확인하지 않음
+    browser_urls = [url for url in tile_urls if not checkpoint.is_done(url) and url not in tried_urls]
+    candidate_urls += browser_urls
+    if browser_urls:
+        ranked = image_probe.rank_candidates(image_probe.probe_images(browser_urls, headers=headers))
+        logging.info(f"후보 {len(browser_urls)}개 중 사용 가능한 이미지 {len(ranked)}개")
+        download_ranked(ranked, base_save_dir, checkpoint, downloaded_filepaths, num_images)
+
+    # 2단계: 부족한 만큼만 기존 방식(타일 클릭 후 상세보기 이미지)으로 채움
+    for i in range(num_images - len(downloaded_filepaths)):
         try:
             # 새로 검색 페이지 로드 (네트워크 재시도 포함)
             if not safe_driver_get(driver, search_url):
                 logging.error("검색 페이지 로드 실패로 인해 해당 이미지 스킵")
                 continue
-            time.sleep(5)
+            wait_for_search_page(driver, diagnostics)
             containers = driver.find_elements(By.CSS_SELECTOR, 'div[class*="mod_image_tile"] img')
             total = len(containers)
-            if total == 0:
-                logging.error("검색 결과에서 이미지 컨테이너를 찾지 못함.")
-                break
             # 아직 사용하지 않은 인덱스에서 랜덤 선택 (모두 사용했으면 전체에서 선택)
             available = [idx for idx in range(total) if idx not in used_indices]
             if not available:
@@ -350,22 +563,32 @@ def download_multiple_images(search_url, num_images=4, folder_index="default"):
             used_indices.append(chosen_index)
             logging.info(f"선택된 이미지 인덱스: {chosen_index} (총 {total}개 중)")
             
-            detailed_url = get_actual_image_url(driver, search_url, image_index=chosen_index)
+            detailed_url = get_actual_image_url(driver, search_url, image_index=chosen_index,
+                                                diagnostics=diagnostics)
             if not detailed_url:
                 logging.error("상세 이미지 URL 추출 실패")
                 continue
+            if checkpoint.is_done(detailed_url):
+                logging.info(f"이미 저장된 이미지, 건너뜀: {detailed_url}")
+                continue
             logging.info(f"다운로드할 상세 이미지 URL: {detailed_url}")
             
             saved_path = download_image(detailed_url, save_dir=base_save_dir)
             if saved_path:
                 logging.info(f"이미지 저장 완료: {saved_path}")
+                checkpoint.record(detailed_url, saved_path)
                 downloaded_filepaths.append(saved_path)
             else:
                 logging.error("이미지 다운로드 실패.")
+        except PageStateError as e:
+            logging.error(f"검색 페이지 상태 {e.state}, 남은 이미지 다운로드 중단")
+            break
         except Exception as e:
             logging.error(f"이미지 다운로드 중 에러: {str(e)}")
     
     driver.quit()
+    # 이번 후보의 임시 파일은 다음 실행에서 이어받도록 남기고, 나머지 오래된 것은 정리
+    checkpoint.cleanup_tmp(keep_urls=candidate_urls)
     return downloaded_filepaths
 
 def update_google_sheet(sheet, index_value):
@@ -374,18 +597,35 @@ def update_google_sheet(sheet, index_value):
     # ✅ 현재 시간 기록
     current_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
     cell_address = f"C{index_value}"  # index_value가 행 번호라고 가정
-    sheet.update_acell(cell_address, current_time)
+    with metrics.timer("sheets_update"):
+        sheet.update_acell(cell_address, current_time)
     
     print(f"구글 스프레드시트 {cell_address} 업데이트 완료: {current_time}")
 
-def main():
+def main(query=None, dry_run=False, num_images=4):
     """
     Main function to execute the process:
         1. Read the index and QUERY string from Google Sheets.
         2. Build the search URL.
         3. Download multiple images and save them in a folder named with the index.
         4. Log results.
+
+    Args:
+        query (str): 검색어를 직접 지정하면 Google Sheets를 읽지 않음 (시트 업데이트도 생략).
+        dry_run (bool): 검색 URL만 출력하고 브라우저/다운로드는 실행하지 않음.
+        num_images (int): 원하는 다운로드 이미지 개수.
     """
+    if not dry_run:
+        configure_logging()
+    if query:
+        search_url = build_search_url(query)
+        print(f"검색 URL: {search_url}")
+        if dry_run:
+            return
+        downloaded = download_multiple_images(search_url, num_images, folder_index="manual")
+        print(f"다운로드 완료된 이미지 파일들: {downloaded}")
+        return
+
     credentials_json, spreadsheet_id = get_gsheet_config()
     query, index_value , sheet = get_query_from_gsheet(credentials_json, spreadsheet_id)
     if not query:
@@ -395,8 +635,9 @@ def main():
     search_url = build_search_url(query)
     logging.info(f"생성된 검색 URL: {search_url}")
     print(f"검색 URL: {search_url}")        
+    if dry_run:
+        return
     
-    num_images = 4  # 원하는 다운로드 이미지 개수
     downloaded = download_multiple_images(search_url, num_images, folder_index=str(index_value))
     if downloaded:
         logging.info(f"총 {len(downloaded)}장의 이미지 다운로드 완료.")
@@ -0,0 +1,241 @@
+"""
+Header-only image probing for the Naver image stage.
+
+Instead of downloading every candidate image in full, each candidate is
+requested with `Range: bytes=0-<N>` and only the first few KB are read.
+The format, width and height are parsed from the image header
+(JPEG / PNG / GIF / WebP), candidates are ranked by resolution and aspect
+ratio, and only the best ones are handed to download_image().
+
+Usage:
+    urls = candidate_urls_from_tiles(tiles, base_url=search_url)
+    probes = probe_images(urls)
+    for probe in rank_candidates(probes)[:4]:
+        download_image(probe["url"], save_dir)
+"""
+
+import logging
+import struct
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import parse_qs, urljoin, urlsplit
+
+import requests
+
+import adaptive_concurrency
+import metrics
+import proxy_pool
+
+PROBE_BYTES = 8 * 1024       # 대부분의 PNG/GIF/WebP, EXIF가 작은 JPEG는 여기서 끝남
+MAX_PROBE_BYTES = 64 * 1024  # EXIF/썸네일이 큰 JPEG는 SOF 마커가 뒤에 있어 한 번 더 읽음
+MIN_WIDTH = 600
+MIN_HEIGHT = 400
+MIN_ASPECT = 0.6   # 세로로 너무 긴 이미지 제외
+MAX_ASPECT = 2.2   # 배너처럼 가로로 너무 긴 이미지 제외
+IDEAL_ASPECT = 1.5  # 블로그 본문용 3:2 가로 이미지 선호
+
+# SOF(Start Of Frame) 마커: 0xC0~0xCF 중 DHT(C4), JPG(C8), DAC(CC) 제외
+JPEG_SOF_MARKERS = {0xC0, 0xC1, 0xC2, 0xC3, 0xC5, 0xC6, 0xC7, 0xC9, 0xCA, 0xCB, 0xCD, 0xCE, 0xCF}
+
+
+def parse_image_header(data):
+    """
+    Parses format, width and height from the first bytes of an image.
+
+    Returns:
+        tuple or None: (format, width, height), or None if the header is
+        incomplete or the format is not recognised.
+    """
+    if data.startswith(b"\x89PNG\r\n\x1a\n"):
+        if len(data) < 24:
+            return None
+        width, height = struct.unpack(">II", data[16:24])
+        return "png", width, height
+
+    if data[:6] in (b"GIF87a", b"GIF89a"):
+        if len(data) < 10:
+            return None
+        width, height = struct.unpack("<HH", data[6:10])
+        return "gif", width, height
+
+    if data[:4] == b"RIFF" and data[8:12] == b"WEBP":
+        chunk = data[12:16]
+        if chunk == b"VP8 " and len(data) >= 30:
+            width, height = struct.unpack("<HH", data[26:30])
+            return "webp", width & 0x3FFF, height & 0x3FFF
+        if chunk == b"VP8L" and len(data) >= 25:
+            bits = int.from_bytes(data[21:25], "little")
+            return "webp", (bits & 0x3FFF) + 1, ((bits >> 14) & 0x3FFF) + 1
+        if chunk == b"VP8X" and len(data) >= 30:
+            width = int.from_bytes(data[24:27], "little") + 1
+            height = int.from_bytes(data[27:30], "little") + 1
+            return "webp", width, height
+        return None
+
+    if data[:2] == b"\xff\xd8":
+        pos = 2
+        while pos + 4 <= len(data):
+            if data[pos] != 0xFF:
+                return None  # 마커 위치가 어긋남 (손상된 파일)
+            marker = data[pos + 1]
+            if marker == 0xFF:  # 채움 바이트
+                pos += 1
+                continue
+            if marker in (0xD8, 0x01) or 0xD0 <= marker <= 0xD7:  # 길이 없는 마커
+                pos += 2
+                continue
+            segment_length = struct.unpack(">H", data[pos + 2:pos + 4])[0]
+            if marker in JPEG_SOF_MARKERS:
+                if pos + 9 > len(data):
+                    return None
+                height, width = struct.unpack(">HH", data[pos + 5:pos + 9])
+                return "jpeg", width, height
+            pos += 2 + segment_length
+        return None
+
+    return None
+
+
+def _read_prefix(url, length, headers, timeout, session):
+    """ Range 요청으로 앞부분만 읽고 (데이터, 전체 크기)를 반환. 서버가 Range를 무시해도 length까지만 읽음. """
+    request_headers = dict(headers or {})
+    request_headers["Range"] = f"bytes=0-{length - 1}"
+    limiter = adaptive_concurrency.default_limiter()
+    with limiter.acquire(urlsplit(url).hostname or "") as slot:
+        started = time.perf_counter()
+        with proxy_pool.get(url, session=session, headers=request_headers, timeout=timeout, stream=True) as response:
+            slot.record_response(response, time.perf_counter() - started)
+            return _read_response_prefix(response, length)
+
+
+def _read_response_prefix(response, length):
+    if response.status_code not in (200, 206):
+        raise requests.HTTPError(f"HTTP 상태 코드 {response.status_code}", response=response)
+    total = None
+    content_range = response.headers.get("Content-Range", "")
+    if "/" in content_range and content_range.rsplit("/", 1)[1].isdigit():
+        total = int(content_range.rsplit("/", 1)[1])
+    elif response.status_code == 200 and response.headers.get("Content-Length", "").isdigit():
+        total = int(response.headers["Content-Length"])
+    data = b""
+    for chunk in response.iter_content(chunk_size=4096):
+        data += chunk
+        if len(data) >= length:
+            break
+    return data[:length], total
+
+
+@metrics.timed()
+def probe_image(url, headers=None, timeout=5, session=None):
+    """
+    Reads only the image header of `url`.
+
+    Returns:
+        dict or None: {"url", "format", "width", "height", "content_length", "probe_bytes"},
+        or None if the header could not be fetched or parsed.
+    """
+    probe_bytes = 0
+    try:
+        for length in (PROBE_BYTES, MAX_PROBE_BYTES):
+            data, total = _read_prefix(url, length, headers, timeout, session)
+            probe_bytes += len(data)
+            parsed = parse_image_header(data)
+            if parsed or len(data) < length:
+                break  # 파싱 성공 또는 파일 전체를 이미 읽음
+    except Exception as e:
+        logging.warning(f"이미지 헤더 확인 실패: {url} ({e})")
+        metrics.incr("image_probe_failures")
+        return None
+    finally:
+        metrics.incr("image_probe_bytes", probe_bytes)
+
+    if not parsed:
+        logging.warning(f"이미지 헤더를 해석하지 못함: {url}")
+        metrics.incr("image_probe_failures")
+        return None
+    image_format, width, height = parsed
+    return {
+        "url": url,
+        "format": image_format,
+        "width": width,
+        "height": height,
+        "content_length": total,
+        "probe_bytes": probe_bytes,
+    }
+
+
+def probe_images(urls, headers=None, max_workers=8, timeout=5):
+    """ Probes candidates in parallel (each probe is only a few KB) and drops failures. """
+    if not urls:
+        return []
+    session = requests.Session()
+    try:
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(urls))) as pool:
+            probes = list(pool.map(lambda url: probe_image(url, headers, timeout, session), urls))
+    finally:
+        session.close()
+    return [probe for probe in probes if probe]
+
+
+def score_candidate(probe, min_width=MIN_WIDTH, min_height=MIN_HEIGHT):
+    """
+    Resolution score, discounted the further the aspect ratio is from
+    IDEAL_ASPECT. Returns None for images that are too small or too
+    narrow/wide to be useful in a blog post (thumbnails, logos, banners).
+    """
+    width, height = probe["width"], probe["height"]
+    if width < min_width or height < min_height:
+        return None
+    aspect = width / height
+    if not MIN_ASPECT <= aspect <= MAX_ASPECT:
+        return None
+    aspect_penalty = abs(aspect - IDEAL_ASPECT) / IDEAL_ASPECT
+    return width * height * (1 - 0.5 * min(aspect_penalty, 1))
+
+
+def rank_candidates(probes, min_width=MIN_WIDTH, min_height=MIN_HEIGHT):
+    """ Returns the usable probes, best first. """
+    scored = []
+    for probe in probes:
+        score = score_candidate(probe, min_width, min_height)
+        if score is None:
+            logging.info(f"후보 제외 ({probe['width']}x{probe['height']} {probe['format']}): {probe['url']}")
+            continue
+        scored.append((score, probe))
+    scored.sort(key=lambda item: item[0], reverse=True)
+    return [probe for _, probe in scored]
+
+
+def original_url_from_tile(src, data_original=None, base_url=None):
+    """
+    Original image URL for a search result tile.
+
+    Naver thumbnails are served as `https://search.pstatic.net/common/?src=<original>&type=...`,
+    so the original is the `src` query parameter. A `data-original`
+    attribute, when present, takes precedence.
+    """
+    if data_original:
+        return urljoin(base_url or "", data_original)
+    if not src:
+        return None
+    src = urljoin(base_url or "", src)
+    original = parse_qs(urlsplit(src).query).get("src")
+    if original and original[0].startswith("http"):
+        return original[0]
+    return None
+
+
+def candidate_urls_from_tiles(tiles, base_url=None):
+    """
+    Args:
+        tiles (list): [{"src": ..., "original": ...}, ...] as collected from the result tiles.
+
+    Returns:
+        list: unique original image URLs in page order.
+    """
+    urls = []
+    for tile in tiles:
+        url = original_url_from_tile(tile.get("src"), tile.get("original"), base_url)
+        if url and url not in urls:
+            urls.append(url)
+    return urls
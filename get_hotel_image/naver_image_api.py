@@ -0,0 +1,231 @@
+"""
+Browserless tile discovery for the Naver image stage.
+
+Naver already delivers the metadata of every result tile (original image
+URL, width, height, title) with the search page, and the same data is
+served as JSON by the paging endpoint the page itself calls when you
+scroll. Reading it with plain requests replaces a Chrome session per hotel
+with one or two HTTP requests:
+
+    1. paging endpoint  s.search.naver.com/p/c/image/search.naver?json_type=6&query=...
+    2. search page HTML (tiles' data-original / thumbnail src, JSON embedded in <script>)
+
+Tiles whose original size is known need no header probe; the rest go
+through image_probe. When both requests fail or return nothing usable, the
+caller falls back to Selenium (hotel_image_naver.download_multiple_images),
+the same tier-then-fallback order as drama_of_netflix.main(). A captcha,
+block or "no results" answer raises PageStateError instead, since a
+browser on the same host would see the same page.
+
+Usage:
+    tiles = fetch_tiles(search_url)
+    ranked = image_probe.rank_candidates(candidates_from_tiles(tiles))
+"""
+
+import json
+import logging
+import re
+import time
+from urllib.parse import parse_qs, urlencode, urljoin, urlsplit
+
+from bs4 import BeautifulSoup
+
+import adaptive_concurrency
+import image_probe
+import metrics
+import page_state
+import proxy_pool
+from page_state import PageStateError
+
+PAGING_URL = "https://s.search.naver.com/p/c/image/search.naver"
+PAGE_SIZE = 50
+
+# 페이징 JSON/페이지 내 스크립트의 필드 이름 (응답 버전에 따라 다름).
+# 크기는 원본 크기 키만 사용 (일반 width/height는 썸네일 크기일 수 있으므로 그런 타일은 헤더를 확인)
+URL_KEYS = ("originalUrl", "originalImageUrl", "orgUrl")
+WIDTH_KEYS = ("orgWidth", "originalWidth")
+HEIGHT_KEYS = ("orgHeight", "originalHeight")
+THUMB_KEYS = ("thumb", "thumbUrl", "viewerThumb")
+
+# <script> 안에 들어 있는 타일 객체 (중첩 없는 {...} 중 원본 주소 키를 가진 것)
+EMBEDDED_TILE = re.compile(r'\{[^{}]*"(?:%s)"\s*:\s*"[^"]+"[^{}]*\}' % "|".join(URL_KEYS))
+JSONP = re.compile(r"^\s*[\w$.]+\s*\((.*)\)\s*;?\s*$", re.S)
+
+
+def query_from_search_url(search_url):
+    values = parse_qs(urlsplit(search_url).query).get("query")
+    return values[0] if values else None
+
+
+def build_paging_url(query, start=1, display=PAGE_SIZE, paging_url=PAGING_URL):
+    params = {"json_type": 6, "where": "image", "query": query, "start": start, "display": display}
+    return f"{paging_url}?{urlencode(params)}"
+
+
+def _first(item, keys):
+    for key in keys:
+        if item.get(key) not in (None, ""):
+            return item[key]
+    return None
+
+
+def _as_int(value):
+    try:
+        return int(float(value))
+    except (TypeError, ValueError):
+        return None
+
+
+def tile_from_item(item, base_url=None):
+    """
+    Normalises one tile object (paging JSON item or embedded script object).
+
+    Returns:
+        dict or None: {"url", "width", "height", "thumb", "title"}; width and
+        height are None when the item does not carry the original size.
+    """
+    url = _first(item, URL_KEYS)
+    if not url and _first(item, THUMB_KEYS):
+        url = image_probe.original_url_from_tile(_first(item, THUMB_KEYS), base_url=base_url)
+    if not url:
+        return None
+    return {
+        "url": urljoin(base_url or "", url),
+        "width": _as_int(_first(item, WIDTH_KEYS)),
+        "height": _as_int(_first(item, HEIGHT_KEYS)),
+        "thumb": _first(item, THUMB_KEYS),
+        "title": item.get("title"),
+    }
+
+
+def _unique(tiles):
+    seen = set()
+    result = []
+    for tile in tiles:
+        if tile and tile["url"] not in seen:
+            seen.add(tile["url"])
+            result.append(tile)
+    return result
+
+
+def parse_paging_json(text, base_url=None):
+    """ Tiles from a paging endpoint response (plain JSON or a JSONP callback). """
+    text = text.strip()
+    match = None if text.startswith("{") else JSONP.match(text)
+    data = json.loads(match.group(1) if match else text)
+    items = data.get("items") or data.get("result", {}).get("items") or []
+    return _unique(tile_from_item(item, base_url) for item in items)
+
+
+def parse_serp_html(html, base_url=None):
+    """
+    Tiles from the search page HTML: objects embedded in <script> first
+    (they carry the original size), then the tile <img> attributes.
+    """
+    soup = BeautifulSoup(html, "html.parser")
+    tiles = []
+    for script in soup.find_all("script"):
+        for match in EMBEDDED_TILE.finditer(script.string or ""):
+            try:
+                tiles.append(tile_from_item(json.loads(match.group(0)), base_url))
+            except ValueError:
+                continue
+    for img in soup.select('div[class*="mod_image_tile"] img'):
+        url = image_probe.original_url_from_tile(
+            img.get("src") or img.get("data-lazy-src"), img.get("data-original") or img.get("data-source"), base_url
+        )
+        if url:
+            tiles.append({"url": url, "width": None, "height": None, "thumb": img.get("src"), "title": img.get("alt")})
+    return _unique(tiles)
+
+
+def _raise_if_banned(response):
+    """ 캡차/차단 응답이면 PageStateError (같은 호스트에 Chrome을 띄워도 결과가 같으므로 중단) """
+    if proxy_pool.is_ban_response(response):
+        captcha = any(marker in response.url.lower() for marker in proxy_pool.CAPTCHA_MARKERS)
+        state = page_state.CAPTCHA if captcha else page_state.BLOCKED
+        raise PageStateError(state, "naver_image", response.url, f"HTTP {response.status_code}")
+
+
+def _get(url, headers, timeout, session):
+    """ proxy_pool + 호스트별 AIMD 제한기를 거쳐 GET (이미지 다운로드와 같은 경로) """
+    limiter = adaptive_concurrency.default_limiter()
+    with limiter.acquire(urlsplit(url).hostname or "") as slot:
+        started = time.perf_counter()
+        response = proxy_pool.get(url, session=session, headers=headers, timeout=timeout)
+        slot.record_response(response, time.perf_counter() - started)
+    return response
+
+
+@metrics.timed()
+def fetch_tiles(search_url, headers=None, timeout=10, session=None, paging_url=PAGING_URL):
+    """
+    Tile metadata for a search without a browser.
+
+    Returns:
+        list: tiles in page order (empty if neither request yielded any;
+        the caller should then fall back to Selenium).
+
+    Raises:
+        PageStateError: Naver answered with a captcha, a block (403/429)
+            or a "no results" page. A browser would see the same, so the
+            caller skips the Selenium fallback.
+    """
+    query = query_from_search_url(search_url)
+    if query:
+        url = build_paging_url(query, paging_url=paging_url)
+        response = None
+        try:
+            response = _get(url, headers, timeout, session)
+            metrics.incr("naver_api_requests", source="paging")
+        except Exception as e:  # 연결 실패: 검색 페이지 HTML로 재시도
+            logging.warning(f"페이징 요청 실패, 검색 페이지로 재시도: {e}")
+        if response is not None:
+            _raise_if_banned(response)
+            if response.ok:
+                try:
+                    tiles = parse_paging_json(response.text, base_url=response.url)
+                except Exception as e:  # 응답 형식이 바뀜: 검색 페이지 HTML로 재시도
+                    logging.warning(f"페이징 응답 처리 실패, 검색 페이지로 재시도: {e}")
+                    tiles = []
+                if tiles:
+                    logging.info(f"페이징 응답에서 타일 {len(tiles)}개 확보: {query}")
+                    return tiles
+            else:
+                logging.warning(f"페이징 응답 상태 코드 {response.status_code}: {url}")
+
+    try:
+        response = _get(search_url, headers, timeout, session)
+        metrics.incr("naver_api_requests", source="serp")
+    except Exception as e:
+        logging.warning(f"검색 페이지 요청 실패: {e}")
+        return []
+    _raise_if_banned(response)
+    if not response.ok:
+        logging.warning(f"검색 페이지 상태 코드 {response.status_code}: {search_url}")
+        return []
+    tiles = parse_serp_html(response.text, base_url=response.url)
+    if tiles:
+        logging.info(f"검색 페이지 HTML에서 타일 {len(tiles)}개 확보")
+        return tiles
+    state, detail = page_state.classify_html("naver_image", response.text, response.url)
+    logging.warning(f"검색 페이지 HTML에 타일 없음 ({state}: {detail})")
+    if state in (page_state.EMPTY, page_state.CAPTCHA, page_state.BLOCKED):
+        raise PageStateError(state, "naver_image", response.url, detail)
+    return []  # ok(타일이 JavaScript로 그려짐) 또는 layout_changed: Selenium으로 확인
+
+
+def candidates_from_tiles(tiles, headers=None):
+    """
+    Probe-shaped candidates for image_probe.rank_candidates(). Tiles that
+    already carry their size are used as-is; only the rest are probed.
+    """
+    known = [
+        {"url": tile["url"], "format": None, "width": tile["width"], "height": tile["height"],
+         "content_length": None, "probe_bytes": 0}
+        for tile in tiles if tile["width"] and tile["height"]
+    ]
+    unknown = [tile["url"] for tile in tiles if not (tile["width"] and tile["height"])]
+    metrics.incr("naver_api_tiles", len(known), size="known")
+    metrics.incr("naver_api_tiles", len(unknown), size="probed")
+    return known + image_probe.probe_images(unknown, headers=headers)
@@ -1,5 +1,8 @@
 import time
 import os
+import json
+import re
+import sys
 import requests
 import gspread
 from bs4 import BeautifulSoup
@@ -13,35 +16,52 @@ from webdriver_manager.chrome import ChromeDriverManager
 from google.oauth2.service_account import Credentials
 import schedule
 
+# 공용 모듈(common tools) 경로 추가
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "common tools"))
+import metrics
+import proxy_pool
+import page_state
+from page_state import PageStateError
+from config_loader import load_config
+from diagnostics import DiagnosticsRecorder
+from agoda_network_capture import NetworkCapture, enable_network_capture, property_id_from_url
+
 # Load configuration
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
-CONFIG_PATH = os.path.join(BASE_DIR, "config.txt")
+# AGODA_CONFIG_PATH로 다른 설정 파일을 지정할 수 있음 (scraping.py --config)
+CONFIG_PATH = os.environ.get("AGODA_CONFIG_PATH", os.path.join(BASE_DIR, "config.txt"))
 GOOGLE_AUTH = os.path.join(BASE_DIR, "google_credentials.json")
+AGODA_HOST = "www.agoda.com"
+# "network"이면 상세 페이지의 XHR JSON 응답을 CDP로 캡처해 필드를 추출 (scraping.py agoda --capture-network)
+CAPTURE_MODE = os.environ.get("AGODA_CAPTURE_MODE", "dom")
+# 갱신 실행 한 번에 열 상세 페이지 수 기본 상한 (config.txt의 MAX_PROPERTY_PAGES_PER_RUN이 우선)
+DEFAULT_MAX_PROPERTY_PAGES = int(os.environ.get("AGODA_MAX_PROPERTY_PAGES", "20"))
 
 def load_api_keys():
-    with open(CONFIG_PATH, "r", encoding="utf-8") as f:
-        keys = {}
-        for line in f:
-            key, value = line.strip().split("=", 1)  # '=' 이후 값을 읽도록 수정
-            keys[key] = value.strip().replace('r"', '').replace('"', '')  # 불필요한 문자 제거
-    return keys 
-
-keys = load_api_keys()
-CREDENTIALS_JSON = os.path.abspath(keys["CREDENTIALS_JSON"])  # 절대 경로 변환
-SPREADSHEET_ID = keys["SPREADSHEET_ID"]  # Google Sheets ID 추가
-TAB_NAME = keys["TAB_NAME"]
-
-def should_execute(idx):
     """
-    Google Sheets에서 A열이 존재하고 F열이 비어있는 경우에만 실행 여부를 확인합니다.
+    config.txt를 읽어 dict로 반환합니다.
+    import 시점이 아니라 처음 필요할 때 읽으며, 같은 파일은 한 번만 파싱됩니다.
     """
+    keys = load_config(CONFIG_PATH)
+    keys["CREDENTIALS_JSON"] = os.path.abspath(keys["CREDENTIALS_JSON"])  # 절대 경로 변환
+    return keys
+
+def get_worksheet():
+    """ 설정된 스프레드시트의 TAB_NAME 워크시트를 엽니다. """
+    keys = load_api_keys()
     scopes = [
         "https://www.googleapis.com/auth/spreadsheets",
         "https://www.googleapis.com/auth/drive"
     ]
-    credentials = Credentials.from_service_account_file(CREDENTIALS_JSON, scopes=scopes)
+    credentials = Credentials.from_service_account_file(keys["CREDENTIALS_JSON"], scopes=scopes)
     client = gspread.authorize(credentials)
-    worksheet = client.open_by_key(SPREADSHEET_ID).worksheet(TAB_NAME)
+    return client.open_by_key(keys["SPREADSHEET_ID"]).worksheet(keys["TAB_NAME"])
+
+def should_execute(idx):
+    """
+    Google Sheets에서 A열이 존재하고 F열이 비어있는 경우에만 실행 여부를 확인합니다.
+    """
+    worksheet = get_worksheet()
     
     a_column_values = worksheet.col_values(1)  # A열 데이터
     f_column_values = worksheet.col_values(6)  # F열 데이터
@@ -55,13 +75,7 @@ def get_next_available_row():
     """
     Google Sheets에서 A열과 E열이 존재하고 F열이 비어있는 첫 번째 행 번호와 URL을 반환합니다.
     """
-    scopes = [
-        "https://www.googleapis.com/auth/spreadsheets",
-        "https://www.googleapis.com/auth/drive"
-    ]
-    credentials = Credentials.from_service_account_file(CREDENTIALS_JSON, scopes=scopes)
-    client = gspread.authorize(credentials)
-    worksheet = client.open_by_key(SPREADSHEET_ID).worksheet(TAB_NAME)
+    worksheet = get_worksheet()
     
     a_column_values = worksheet.col_values(1)  # A열 데이터
     e_column_values = worksheet.col_values(5)  # E열 데이터 (호텔 URL)
@@ -74,112 +88,569 @@ def get_next_available_row():
     return None, None  # 저장할 행이 없음
 
 
-def scrape_agoda_hotel_info(url):
+def create_driver(capture_network=False):
     """
-    Selenium을 사용하여 Agoda 호텔 페이지에서 호텔명, 가격, 위치, 별점, 주요특징, 이용후기 요약을 크롤링합니다.
+    Headless Chrome 드라이버를 생성합니다.
+    capture_network=True이면 네트워크 이벤트를 performance 로그로 남기고 로딩 완료를 기다리지 않습니다.
     """
     options = Options()
     options.add_argument("--headless")  # GUI 없이 실행
     options.add_argument("--disable-gpu")
     options.add_argument("--no-sandbox")
     options.add_argument("--disable-dev-shm-usage")
+    if capture_network:
+        enable_network_capture(options)
+    # SCRAPING_PROXIES가 설정되어 있으면 Agoda에 대한 점수가 좋은 프록시를 사용
+    proxy = proxy_pool.default_pool().choose(AGODA_HOST)
+    if proxy:
+        options.add_argument(proxy_pool.chrome_argument(proxy))
     
-    service = Service(ChromeDriverManager().install())  # ChromeDriver 자동 다운로드 및 경로 설정
-    driver = webdriver.Chrome(service=service, options=options)
-    driver.get(url)
+    with metrics.timer("chrome_startup"):
+        service = Service(ChromeDriverManager().install())  # ChromeDriver 자동 다운로드 및 경로 설정
+        driver = webdriver.Chrome(service=service, options=options)
+    driver.proxy_url = proxy  # 결과를 프록시 풀에 보고할 때 사용
+    return driver
+
+
+# 시트에 기록하는 필드와 열 번호 (F열부터 updated_at, Hotel Name, Price ... 순)
+FIELD_COLUMNS = {
+    "updated_at": 6,       # F열
+    "Hotel Name": 7,       # G열
+    "Price": 8,            # H열
+    "Location": 9,         # I열
+    "Review Score": 10,    # J열
+    "Features": 11,        # K열
+    "Reviews Summary": 12, # L열
+}
+SCRAPED_FIELDS = [field for field in FIELD_COLUMNS if field != "updated_at"]
+
+
+@metrics.timed()
+def scrape_agoda_hotel_info(url, fields=None, capture_network=None):
+    """
+    Selenium을 사용하여 Agoda 호텔 페이지에서 호텔명, 가격, 위치, 별점, 주요특징, 이용후기 요약을 크롤링합니다.
+
+    Args:
+        url (str): 호텔 상세 페이지 URL
+        fields (iterable): 추출할 필드 (SCRAPED_FIELDS 중 일부). 없으면 전체.
+            요청하지 않은 필드는 기다리지도, 결과에 넣지도 않습니다.
+        capture_network (bool): 페이지가 받아오는 JSON 응답에서 필드를 읽음 (기본값: CAPTURE_MODE).
+            이 경우 렌더링/스크롤 대기 없이 응답이 도착하는 즉시 끝나고, 객실별 가격("Room Prices")도 함께 반환합니다.
+            응답에서 찾지 못한 필드만 아래 DOM 방식으로 보충합니다.
+
+    Raises:
+        PageStateError: 페이지가 캡차/차단/판매 종료/레이아웃 변경으로 분류된 경우 (필드 대기 없이 즉시)
+    """
+    fields = set(fields or SCRAPED_FIELDS)
+    if capture_network is None:
+        capture_network = CAPTURE_MODE == "network"
+    driver = create_driver(capture_network=capture_network)
+    capture = NetworkCapture(driver, property_id=property_id_from_url(url)) if capture_network else None
+    started = time.perf_counter()
+    with metrics.timer("page_load"):
+        driver.get(url)
+    metrics.incr("agoda_page_loads", page="property")
     
+    hotel_data = {"updated_at": time.strftime("%Y-%m-%d %H:%M:%S")}
+    if capture:
+        captured = capture.collect(fields)
+        hotel_data.update({field: value for field, value in captured.items()
+                           if field in fields or field == "Room Prices"})
+        fields -= hotel_data.keys()
+        if not fields:
+            driver.quit()
+            _report_proxy(driver, hotel_data, started)
+            return hotel_data
+        print(f"[LOG] 네트워크 응답에 없는 필드를 DOM에서 추출: {sorted(fields)}")
+        metrics.incr("agoda_capture_fallback")
+    
+    # 고정 대기 대신 호텔명이 나타나는 즉시 진행, 캡차/판매 종료 페이지면 필드마다 15초씩 기다리지 않고 중단
+    try:
+        page_state.wait_for_state(driver, "agoda_property")
+    except PageStateError as e:
+        print(f"[LOG] 페이지 상태 {e.state} ({e.detail}): {url}")
+        if e.state == page_state.LAYOUT_CHANGED:
+            # 선택자 갱신에 필요한 스크린샷/HTML을 남김
+            DiagnosticsRecorder(hotel=normalize_property_url(url)).capture_failure(driver, f"page_state_{e.state}: {e.detail}")
+        driver.quit()
+        proxy_pool.default_pool().report(getattr(driver, "proxy_url", None), AGODA_HOST, ok=False,
+                                         latency=time.perf_counter() - started, banned=e.is_ban)
+        raise
     wait = WebDriverWait(driver, 15)
-    time.sleep(5)  # 추가 로딩 대기
     
-    # 페이지 스크롤 다운 (일부 정보가 로딩되지 않을 경우 대비)
-    driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-    time.sleep(3)
+    # 페이지 스크롤 다운 (하단의 주요 특징/이용 후기는 스크롤해야 로딩되며, 아래 wait.until이 로딩을 기다림)
+    if fields & {"Features", "Reviews Summary"}:
+        driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
     
     # 호텔명 추출
-    try:
-        hotel_name_tag = wait.until(EC.presence_of_element_located((By.XPATH, "//h1[@data-selenium='hotel-header-name']")))
-        hotel_name = hotel_name_tag.text.strip()
-    except:
-        hotel_name = "N/A"
+    if "Hotel Name" in fields:
+        try:
+            with metrics.timer("agoda_field", field="name"):
+                hotel_name_tag = wait.until(EC.presence_of_element_located((By.XPATH, "//h1[@data-selenium='hotel-header-name']")))
+                hotel_data["Hotel Name"] = hotel_name_tag.text.strip()
+        except:
+            hotel_data["Hotel Name"] = "N/A"
     
     # 가격 추출
-    try:
-        price_tag = wait.until(EC.presence_of_element_located((By.XPATH, "//div[contains(@class, 'Price')]//span[contains(text(), '₩')]")))
-        price = price_tag.text.strip()
-    except:
-        price = "N/A"
+    if "Price" in fields:
+        try:
+            with metrics.timer("agoda_field", field="price"):
+                price_tag = wait.until(EC.presence_of_element_located((By.XPATH, "//div[contains(@class, 'Price')]//span[contains(text(), '₩')]")))
+                hotel_data["Price"] = price_tag.text.strip()
+        except:
+            hotel_data["Price"] = "N/A"
     
     # 위치 추출
-    try:
-        location_tag = wait.until(EC.presence_of_element_located((By.XPATH, "//span[@data-selenium='hotel-address-map']")))
-        location = location_tag.text.strip()
-    except:
-        location = "N/A"
+    if "Location" in fields:
+        try:
+            with metrics.timer("agoda_field", field="location"):
+                location_tag = wait.until(EC.presence_of_element_located((By.XPATH, "//span[@data-selenium='hotel-address-map']")))
+                hotel_data["Location"] = location_tag.text.strip()
+        except:
+            hotel_data["Location"] = "N/A"
     
     # 별점 추출 (별 개수)
-    try:
-        rating_tag = wait.until(EC.presence_of_element_located((By.XPATH, "//div[@data-selenium='mosaic-hotel-rating']")))
-        stars = len(rating_tag.find_elements(By.TAG_NAME, "svg"))
-    except:
-        stars = "N/A"
+    if "Review Score" in fields:
+        try:
+            with metrics.timer("agoda_field", field="stars"):
+                rating_tag = wait.until(EC.presence_of_element_located((By.XPATH, "//div[@data-selenium='mosaic-hotel-rating']")))
+                stars = len(rating_tag.find_elements(By.TAG_NAME, "svg"))
+        except:
+            stars = "N/A"
+        hotel_data["Review Score"] = f"{stars}성급"
     
     # 주요 특징 추출
-    try:
-        features_tags = wait.until(EC.presence_of_all_elements_located((By.XPATH, "//div[@data-element-name='property-top-feature']//p")))
-        features = ", ".join([tag.text.strip() for tag in features_tags[:5]])
-    except:
-        features = "N/A"
+    if "Features" in fields:
+        try:
+            with metrics.timer("agoda_field", field="features"):
+                features_tags = wait.until(EC.presence_of_all_elements_located((By.XPATH, "//div[@data-element-name='property-top-feature']//p")))
+                hotel_data["Features"] = ", ".join([tag.text.strip() for tag in features_tags[:5]])
+        except:
+            hotel_data["Features"] = "N/A"
     
     # 이용 후기 요약 추출
-    try:
-        reviews_tags = wait.until(EC.presence_of_all_elements_located((By.XPATH, "//div[@data-element-name='atf-review-snippet-sidebar']//span")))
-        reviews_summary = ", ".join([tag.text.strip() for tag in reviews_tags[:4]])
-    except:
-        reviews_summary = "N/A"
+    if "Reviews Summary" in fields:
+        try:
+            with metrics.timer("agoda_field", field="reviews"):
+                reviews_tags = wait.until(EC.presence_of_all_elements_located((By.XPATH, "//div[@data-element-name='atf-review-snippet-sidebar']//span")))
+                hotel_data["Reviews Summary"] = ", ".join([tag.text.strip() for tag in reviews_tags[:4]])
+        except:
+            hotel_data["Reviews Summary"] = "N/A"
     
     driver.quit()
+    _report_proxy(driver, hotel_data, started)
     
-    return {
-        "updated_at": time.strftime("%Y-%m-%d %H:%M:%S"),
-        "Hotel Name": hotel_name,
-        "Price": price,
-        "Location": location,
-        "Review Score": f"{stars}성급",
-        "Features": features,
-        "Reviews Summary": reviews_summary
-    }
+    return hotel_data
+
+MISSING_VALUES = ("N/A", "N/A성급")  # 선택자를 찾지 못했을 때 scrape_agoda_hotel_info가 넣는 값
+
+
+def _extracted_fields(hotel_data):
+    """ 실제로 추출된 필드만 남김 (N/A는 제외, updated_at은 유지) """
+    return {field: value for field, value in hotel_data.items()
+            if field == "updated_at" or value not in MISSING_VALUES}
+
 
-def save_to_google_sheets(hotel_data, idx):
+def _report_proxy(driver, hotel_data, started):
+    """ 필드를 하나도 얻지 못했으면 차단/실패로 보고 프록시 풀에 기록 """
+    ok = any(value not in MISSING_VALUES for field, value in hotel_data.items() if field != "updated_at")
+    proxy_pool.default_pool().report(getattr(driver, "proxy_url", None), AGODA_HOST, ok=ok,
+                                     latency=time.perf_counter() - started)
+
+def _column_letter(col):
+    return chr(ord('A') + col - 1)
+
+@metrics.timed()
+def save_to_google_sheets(hotel_data, idx, worksheet=None):
     """
     Google Sheets에 크롤링한 호텔 정보를 저장하되, F열(idx 번째 행)에 저장합니다.
+    hotel_data에 들어 있는 필드의 열만 한 번의 batch_update로 기록합니다.
     """
     print("[LOG] 수집된 데이터:", hotel_data)
     
-    scopes = [
-        "https://www.googleapis.com/auth/spreadsheets",
-        "https://www.googleapis.com/auth/drive"
-    ]
-    credentials = Credentials.from_service_account_file(CREDENTIALS_JSON, scopes=scopes)
-    client = gspread.authorize(credentials)
+    worksheet = worksheet or get_worksheet()
     
-    worksheet = client.open_by_key(SPREADSHEET_ID).worksheet(TAB_NAME)
-    
-    col = 6  # F열 (1-based index)
     row = idx  # 지정된 행 위치
-    
-    for i, value in enumerate(hotel_data.values(), start=0):
-        worksheet.update_cell(row, col + i, value)
+    worksheet.batch_update([
+        {"range": f"{_column_letter(FIELD_COLUMNS[field])}{row}", "values": [[value]]}
+        for field, value in hotel_data.items() if field in FIELD_COLUMNS
+    ])
+    metrics.incr("sheets_calls", op="batch_update")
+
+# ---------------------------------------------------------------------------
+# 목록(도시/검색 결과) 페이지 기반 가격 일괄 갱신
+# ---------------------------------------------------------------------------
+
+PRICE_COLUMN = FIELD_COLUMNS["Price"]  # H열
+
+# 목록 페이지의 호텔 카드에서 링크와 가격을 한 번의 JavaScript 호출로 모두 읽어옴
+LISTING_CARDS_SCRIPT = """
+return Array.from(document.querySelectorAll("li[data-selenium='hotel-item']")).map(function (card) {
+    var link = card.querySelector("a[data-selenium='hotel-name'], a.PropertyCard__Link, a[href*='/hotel/']");
+    var price = card.querySelector("[data-selenium='display-price']");
+    var currency = card.querySelector("[data-selenium='display-currency']");
+    return {
+        href: link ? link.href : null,
+        price: price ? price.textContent.trim() : null,
+        currency: currency ? currency.textContent.trim() : ""
+    };
+});
+"""
+
+
+def normalize_property_url(url):
+    """
+    Agoda 호텔 URL을 비교 가능한 형태로 정규화합니다.
+    언어 경로(/ko-kr/ 등), 쿼리스트링, 대소문자 차이를 제거합니다.
+        https://www.agoda.com/ko-kr/virgo-hotel/hotel/nha-trang-vn.html?cid=1 → /virgo-hotel/hotel/nha-trang-vn.html
+    """
+    path = re.sub(r"^[a-z]+://[^/]+", "", url.strip().lower())
+    path = re.split(r"[?#]", path, maxsplit=1)[0]
+    return re.sub(r"^/[a-z]{2}-[a-z]{2}(?=/)", "", path)
+
+
+def get_tracked_hotels(worksheet, url_values=None):
+    """ E열에 호텔 URL이 있는 행을 {정규화된 URL: [행 번호, ...]} 형태로 반환 """
+    tracked = {}
+    if url_values is None:
+        url_values = worksheet.col_values(5)  # E열 (호텔 URL)
+    for idx, url in enumerate(url_values, start=1):
+        if url.strip().startswith("http"):
+            tracked.setdefault(normalize_property_url(url), []).append(idx)
+    return tracked
+
+
+@metrics.timed()
+def extract_listing_prices(driver, listing_url, max_scrolls=10):
+    """
+    목록 페이지를 한 번 열고, 더 이상 새 카드가 로드되지 않을 때까지 스크롤한 뒤
+    {정규화된 호텔 URL: 가격 문자열}을 반환합니다.
+
+    Raises:
+        PageStateError: 목록 페이지가 캡차/차단/결과 없음/레이아웃 변경으로 분류된 경우
+    """
+    with metrics.timer("page_load"):
+        driver.get(listing_url)
+    metrics.incr("agoda_page_loads", page="listing")
+    try:
+        page_state.wait_for_state(driver, "agoda_listing")
+    except PageStateError as e:
+        print(f"[LOG] 목록 페이지 상태 {e.state} ({e.detail}): {listing_url}")
+        raise
+
+    # 지연 로딩되는 카드를 위해 카드 수가 더 이상 늘지 않을 때까지 스크롤
+    cards = driver.execute_script(LISTING_CARDS_SCRIPT)
+    for _ in range(max_scrolls):
+        driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
+        with metrics.timer("sleep", reason="listing_scroll"):
+            time.sleep(1.5)
+        more_cards = driver.execute_script(LISTING_CARDS_SCRIPT)
+        if len(more_cards) <= len(cards):
+            cards = more_cards
+            break
+        cards = more_cards
+
+    prices = {}
+    for card in cards:
+        if card.get("href") and card.get("price"):
+            price = card["price"]
+            if card.get("currency") and card["currency"] not in price:
+                price = f"{card['currency']} {price}"
+            prices[normalize_property_url(card["href"])] = price
+    metrics.incr("listing_cards", len(cards))
+    return prices
+
+
+def get_listing_urls():
+    """ config.txt의 PRICE_LISTING_URLS(쉼표 구분)를 목록으로 반환 """
+    return [u.strip() for u in load_api_keys().get("PRICE_LISTING_URLS", "").split(",") if u.strip()]
+
+
+@metrics.timed()
+def refresh_prices_from_listings(listing_urls=None, worksheet=None, tracked=None, freshness=None):
+    """
+    Agoda 도시/검색 결과 페이지를 한 번씩만 열어, 시트에서 추적 중인 호텔의 가격(H열)만 갱신합니다.
+    호텔마다 상세 페이지를 여는 대신 목록 페이지 몇 개로 수백 개 호텔 가격을 갱신할 수 있습니다.
+
+    Args:
+        listing_urls (list): 목록 페이지 URL. 없으면 config.txt의 PRICE_LISTING_URLS(쉼표 구분)를 사용.
+        worksheet: 이미 열어 둔 워크시트 (없으면 새로 엶)
+        tracked (dict): 갱신 대상 {정규화된 URL: [행 번호, ...]} (없으면 E열의 모든 호텔)
+        freshness (dict): 가격 갱신 시각을 기록할 field_freshness 상태. 주면 호출한 쪽이 저장하고,
+            없으면 여기서 읽고 저장합니다 (--refresh-prices 단독 실행도 가격을 최신으로 기록).
+
+    Returns:
+        dict: {행 번호: 가격} — 갱신된 행
+    """
+    listing_urls = listing_urls or get_listing_urls()
+    if not listing_urls:
+        print("[LOG] 가격 갱신에 사용할 목록 페이지 URL이 없습니다 (PRICE_LISTING_URLS).")
+        return {}
+
+    worksheet = worksheet or get_worksheet()
+    tracked = get_tracked_hotels(worksheet) if tracked is None else tracked
+    updated = {}
+
+    driver = create_driver()
+    try:
+        for listing_url in listing_urls:
+            started = time.perf_counter()
+            try:
+                prices = extract_listing_prices(driver, listing_url)
+            except PageStateError as e:
+                proxy_pool.default_pool().report(driver.proxy_url, AGODA_HOST, ok=False,
+                                                 latency=time.perf_counter() - started, banned=e.is_ban)
+                if e.is_ban:
+                    break  # 캡차/차단이면 남은 목록 페이지도 같은 결과이므로 중단
+                continue
+            proxy_pool.default_pool().report(driver.proxy_url, AGODA_HOST, ok=bool(prices),
+                                             latency=time.perf_counter() - started)
+            for property_url, price in prices.items():
+                for row in tracked.get(property_url, []):
+                    updated[row] = price
+            print(f"[LOG] 목록 페이지 {listing_url}: 카드 {len(prices)}개, 누적 매칭 {len(updated)}개")
+            if len(updated) == sum(len(rows) for rows in tracked.values()):
+                break  # 추적 중인 호텔을 모두 찾았으면 남은 목록 페이지는 열지 않음
+    finally:
+        driver.quit()
+
+    if updated:
+        # 가격 열만 한 번의 batch_update 호출로 기록
+        worksheet.batch_update([
+            {"range": f"{_column_letter(PRICE_COLUMN)}{row}", "values": [[price]]}
+            for row, price in sorted(updated.items())
+        ])
+        metrics.incr("sheets_calls", op="batch_update")
+        # 모든 행이 갱신된 호텔만 가격을 최신으로 기록 (refresh_stale_fields가 상세 페이지를 다시 열지 않도록)
+        state = load_freshness() if freshness is None else freshness
+        for property_url, rows in tracked.items():
+            if rows and all(row in updated for row in rows):
+                _mark_fresh(state, property_url, ["Price"])
+        if freshness is None:
+            _save_freshness(state)
+    missing = sorted(row for rows in tracked.values() for row in rows if row not in updated)
+    print(f"[LOG] 가격 갱신 완료: {len(updated)}개 행, 목록에서 찾지 못한 행 {len(missing)}개")
+    return updated
+
+
+# ---------------------------------------------------------------------------
+# 필드별 갱신 주기 (가격은 자주, 정적인 정보는 드물게)
+# ---------------------------------------------------------------------------
+
+HOUR = 60 * 60
+# 필드별 최대 허용 나이(초). 이보다 오래된 필드만 다시 수집합니다.
+FIELD_POLICIES = {
+    "Price": 6 * HOUR,
+    "Reviews Summary": 7 * 24 * HOUR,
+    "Hotel Name": 30 * 24 * HOUR,
+    "Location": 30 * 24 * HOUR,
+    "Review Score": 30 * 24 * HOUR,
+    "Features": 30 * 24 * HOUR,
+}
+# {정규화된 호텔 URL: {필드: 마지막 갱신 시각}} — 시트에는 행 전체의 updated_at만 있으므로 로컬에 보관
+FRESHNESS_PATH = os.path.join(BASE_DIR, "field_freshness.json")
+TIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+
+def load_freshness():
+    if not os.path.exists(FRESHNESS_PATH):
+        return {}
+    with open(FRESHNESS_PATH, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _save_freshness(state):
+    tmp_path = FRESHNESS_PATH + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(state, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, FRESHNESS_PATH)  # 원자적 교체로 중간 상태 파일이 남지 않도록 함
+
+
+def _mark_fresh(state, property_url, fields, updated_at=None):
+    entry = state.setdefault(property_url, {})
+    for field in fields:
+        entry[field] = updated_at or time.strftime(TIME_FORMAT)
+
+
+def _parse_time(value):
+    try:
+        return time.mktime(time.strptime(value, TIME_FORMAT))
+    except (TypeError, ValueError):
+        return None
+
+
+def stale_fields(entry, now=None):
+    """ 갱신 주기가 지난(또는 기록이 없는) 필드 목록을 SCRAPED_FIELDS 순서로 반환 """
+    now = now or time.time()
+    stale = []
+    for field in SCRAPED_FIELDS:
+        updated_at = _parse_time(entry.get(field))
+        if updated_at is None or now - updated_at >= FIELD_POLICIES[field]:
+            stale.append(field)
+    return stale
+
+
+def plan_refresh(state, property_urls, now=None, listing_available=True):
+    """
+    호텔마다 오래된 필드를 만족시키는 가장 싼 수집 경로를 고릅니다.
+        가격만 오래됨      → 목록 페이지 (페이지 하나로 여러 호텔)
+        그 외 필드가 오래됨 → 상세 페이지 (오래된 필드만 추출)
+
+    Returns:
+        (list, dict): 목록 페이지로 가격을 갱신할 URL, {상세 페이지로 갱신할 URL: [필드, ...]}
+    """
+    via_listing = []
+    via_property = {}
+    for property_url in property_urls:
+        fields = stale_fields(state.get(property_url, {}), now)
+        if not fields:
+            continue
+        if fields == ["Price"] and listing_available:
+            via_listing.append(property_url)
+        else:
+            via_property[property_url] = fields
+    return via_listing, via_property
+
+
+@metrics.timed()
+def refresh_stale_fields(listing_urls=None, max_property_pages=None):
+    """
+    이미 수집된 행(F열이 채워진 행)에서 갱신 주기가 지난 필드만 다시 수집합니다.
+    가격만 오래된 호텔은 목록 페이지로 일괄 갱신하고, 목록에서 찾지 못했거나
+    다른 필드도 오래된 호텔만 상세 페이지를 엽니다.
+
+    Args:
+        listing_urls (list): 목록 페이지 URL (없으면 PRICE_LISTING_URLS)
+        max_property_pages (int): 한 번에 열 상세 페이지 수 상한 (나머지는 다음 실행에서 처리).
+            없으면 config.txt의 MAX_PROPERTY_PAGES_PER_RUN, 그것도 없으면 DEFAULT_MAX_PROPERTY_PAGES
+
+    Returns:
+        dict: {"listing_rows": 목록으로 갱신된 행 수, "property_pages": 연 상세 페이지 수, "deferred": 미룬 호텔 수}
+    """
+    if max_property_pages is None:
+        max_pages = load_api_keys().get("MAX_PROPERTY_PAGES_PER_RUN")
+        max_property_pages = int(max_pages) if max_pages else DEFAULT_MAX_PROPERTY_PAGES
+    worksheet = get_worksheet()
+    url_values = worksheet.col_values(5)  # E열 (호텔 URL)
+    updated_at_values = worksheet.col_values(6)  # F열 (updated_at)
+
+    # 처음 수집(job)이 끝난 행만 대상으로 함 (F열이 "N/A (empty)"인 판매 종료 행은 제외)
+    tracked = {}
+    for property_url, rows in get_tracked_hotels(worksheet, url_values).items():
+        rows = [row for row in rows
+                if row <= len(updated_at_values) and _parse_time(updated_at_values[row - 1]) is not None]
+        if rows:
+            tracked[property_url] = rows
+
+    state = load_freshness()
+    for property_url, rows in tracked.items():
+        unknown = [field for field in SCRAPED_FIELDS if field not in state.get(property_url, {})]
+        if unknown:
+            # 기록이 없는 필드(예: --refresh-prices만 실행된 기존 행의 가격 외 필드)는
+            # 시트의 updated_at을 갱신 시각으로 간주
+            _mark_fresh(state, property_url, unknown, updated_at_values[rows[0] - 1])
+
+    listing_urls = listing_urls or get_listing_urls()
+    via_listing, via_property = plan_refresh(state, tracked, listing_available=bool(listing_urls))
+    print(f"[LOG] 갱신 계획: 목록 페이지로 가격 갱신 {len(via_listing)}개, 상세 페이지 {len(via_property)}개")
+
+    listing_rows = 0
+    if via_listing:
+        updated = refresh_prices_from_listings(
+            listing_urls, worksheet, {property_url: tracked[property_url] for property_url in via_listing},
+            freshness=state,
+        )
+        listing_rows = len(updated)
+        for property_url in via_listing:
+            if not all(row in updated for row in tracked[property_url]):
+                via_property[property_url] = ["Price"]  # 목록에 없던 호텔은 상세 페이지로
+        _save_freshness(state)
+
+    jobs = sorted(via_property.items(), key=lambda item: len(item[1]), reverse=True)
+    jobs, deferred = jobs[:max_property_pages], jobs[max_property_pages:]
+    for position, (property_url, fields) in enumerate(jobs):
+        rows = tracked[property_url]
+        try:
+            hotel_info = scrape_agoda_hotel_info(url_values[rows[0] - 1], fields=fields)
+        except PageStateError as e:
+            if e.is_ban:
+                # 캡차/차단이면 남은 호텔도 같은 결과이므로 다음 실행으로 미룸
+                deferred = jobs[position:] + deferred
+                jobs = jobs[:position]
+                break
+            continue  # 판매 종료/레이아웃 변경: 이 호텔만 건너뜀 (오래된 값은 다음 실행에서 다시 시도)
+        # 선택자를 놓친 필드(N/A)는 시트의 기존 값을 덮어쓰지 않고, 갱신된 것으로 기록하지도 않음
+        hotel_info = _extracted_fields(hotel_info)
+        extracted = [field for field in fields if field in hotel_info]
+        if not extracted:
+            print(f"[LOG] 추출된 필드가 없어 기록하지 않음: {property_url}")
+            continue
+        for row in rows:
+            save_to_google_sheets(hotel_info, row, worksheet)
+        _mark_fresh(state, property_url, extracted, hotel_info["updated_at"])
+        _save_freshness(state)  # 호텔마다 저장해 중간에 죽어도 끝난 작업은 반복하지 않음
+
+    print(f"[LOG] 필드 갱신 완료: 목록 갱신 {listing_rows}개 행, 상세 페이지 {len(jobs)}개, 다음으로 미룸 {len(deferred)}개")
+    return {"listing_rows": listing_rows, "property_pages": len(jobs), "deferred": len(deferred)}
+
 
 def job():
     idx, hotel_url = get_next_available_row()
     if idx and hotel_url:
-        hotel_info = scrape_agoda_hotel_info(hotel_url)
+        try:
+            hotel_info = scrape_agoda_hotel_info(hotel_url)
+        except PageStateError as e:
+            # 스케줄러 루프가 죽지 않도록 여기서 처리
+            if e.is_ban:
+                # 캡차/차단은 일시적이므로 아무것도 쓰지 않고 다음 실행에서 같은 행을 다시 시도
+                print(f"[LOG] {idx}행 수집 중단 ({e.state}): {hotel_url}")
+                return
+            if e.state == page_state.EMPTY:
+                # 판매 종료는 다시 열어도 같으므로 F열에 상태를 남겨 다음 행으로 넘어감
+                print(f"[LOG] {idx}행 건너뜀 ({e.state}): {hotel_url}")
+                save_to_google_sheets({"updated_at": f"N/A ({e.state})"}, idx)
+                return
+            # 레이아웃 변경(느린 로딩 포함)은 F열을 비워 두어 선택자를 고친 뒤 같은 행을 다시 시도
+            print(f"[LOG] {idx}행 수집 실패 ({e.state}), 진단 자료 확인 필요: {hotel_url}")
+            return
         save_to_google_sheets(hotel_info, idx)
+        # N/A로 남은 필드는 갱신된 것으로 기록하지 않아 다음 갱신 주기에 다시 수집
+        extracted = [field for field in SCRAPED_FIELDS if field in _extracted_fields(hotel_info)]
+        state = load_freshness()
+        _mark_fresh(state, normalize_property_url(hotel_url), extracted, hotel_info["updated_at"])
+        _save_freshness(state)
+
+
+def refresh_job():
+    refresh_stale_fields()  # 상세 페이지 수 상한은 MAX_PROPERTY_PAGES_PER_RUN 또는 DEFAULT_MAX_PROPERTY_PAGES
+
+
+def main(once=False, refresh_prices=False, listing_urls=None, refresh_stale=False):
+    """
+    once=True이면 job()을 한 번만 실행하고 종료합니다 (cron 등 외부 스케줄러용).
+    refresh_prices=True이면 목록 페이지로 가격만 일괄 갱신하고 종료합니다.
+    refresh_stale=True이면 갱신 주기가 지난 필드만 한 번 다시 수집하고 종료합니다.
+    """
+    if refresh_prices:
+        refresh_prices_from_listings(listing_urls)
+        return
+    if refresh_stale:
+        refresh_stale_fields(listing_urls)
+        return
+    if once:
+        job()
+        return
+
+    #한 시간마다 실행하도록 설정
+    schedule.every(1).hours.do(job)
+    # 오래된 필드만 갱신 (대부분의 실행은 6시간마다 목록 페이지 몇 개로 끝남)
+    schedule.every(1).hours.do(refresh_job)
+
+    while True:
+        schedule.run_pending()
+        time.sleep(60)
 
 
-#한 시간마다 실행하도록 설정
-schedule.every(1).hours.do(job)
+if __name__ == "__main__":
+    main()
 
-while True:
-    schedule.run_pending()
-    time.sleep(60)
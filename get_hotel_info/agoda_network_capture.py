@@ -0,0 +1,309 @@
+"""
+Agoda 호텔 페이지가 XHR로 받아오는 JSON 응답을 Chrome DevTools Protocol(CDP)로 가로채서
+DOM 렌더링을 기다리지 않고 필드를 추출합니다.
+
+동작 방식:
+    1. Chrome을 performance 로그(goog:loggingPrefs) + pageLoadStrategy "none"으로 띄움
+    2. driver.get() 직후부터 Network.responseReceived / Network.loadingFinished 이벤트를 폴링
+    3. CAPTURE_TARGETS에 맞는 JSON 응답 본문을 Network.getResponseBody로 읽음
+    4. 필요한 필드가 모두 모이면 window.stop()으로 나머지 로딩(이미지, 광고 등)을 중단
+
+응답에는 주변 호텔, 후기 작성자, 랜드마크 등 다른 엔터티의 name/address도 들어 있으므로
+필드는 이 호텔의 노드(PROPERTY_PATHS 위치, 숙소 ID가 있으면 URL의 ID와 같은 것)와 그 바로 아래
+알려진 섹션(SECTION_KEYS)에서만 찾습니다. 찾지 못한 필드는 결과에서 빠지며,
+호출 측(scrape_agoda_hotel_info)이 DOM 방식으로 보충합니다.
+
+사용 예:
+    enable_network_capture(options)        # create_driver(capture_network=True)
+    capture = NetworkCapture(driver, property_id=property_id_from_url(url))
+    driver.get(url)
+    hotel_data = capture.collect({"Hotel Name", "Price"}, timeout=20)
+"""
+
+import base64
+import json
+import re
+import time
+
+import metrics
+
+# 응답 종류 -> (URL 패턴, 이 응답에서 얻을 수 있는 필드)
+CAPTURE_TARGETS = {
+    "secondary": (
+        re.compile(r"/api/cronos/property/BelowFoldParams/GetSecondaryData|/api/[^?]*/property/.*(info|detail)", re.I),
+        {"Hotel Name", "Location", "Review Score", "Features", "Reviews Summary"},
+    ),
+    "rooms": (
+        re.compile(r"/graphql/property|/api/[^?]*(RoomGrid|rooms|pricing)", re.I),
+        {"Price", "Room Prices"},
+    ),
+}
+
+# 응답 안에서 이 호텔의 노드가 있는 위치 (리스트면 각 원소가 후보)
+PROPERTY_PATHS = ((), ("data", "propertyDetailsSearch", "propertyDetails"))
+PROPERTY_ID_KEYS = ("hotelId", "propertyId")
+# 호텔 노드 바로 아래에서 필드를 찾을 섹션 (주변 호텔/후기 목록 등으로는 내려가지 않음)
+SECTION_KEYS = ("hotelInfo", "propertyInfo", "aboutHotel", "reviews", "summary")
+PROPERTY_ID_PARAM = re.compile(r"[?&](?:hotel_id|hid|propertyId|hotelId)=(\d+)", re.I)
+
+NAME_KEYS = ("hotelName", "propertyName", "displayName")
+ADDRESS_KEYS = ("fullAddress", "address", "addressLine")
+STAR_KEYS = ("starRating", "hotelRating", "accommodationRating")
+FEATURE_KEYS = ("topFeatures", "features", "highlights", "facilityHighlights")
+REVIEW_KEYS = ("reviewSnippets", "snippets", "reviewComments")
+ROOM_KEYS = ("masterRooms", "roomGrid", "rooms")
+ROOM_NAME_KEYS = ("masterRoomName", "roomName", "name")
+ROOM_PRICE_KEYS = ("displayPrice", "perNightPrice", "display", "price", "amount")
+CURRENCY_KEYS = ("currencyCode", "currency")
+TEXT_KEYS = ("name", "title", "text", "snippet", "comment", "description")
+
+
+def enable_network_capture(options):
+    """ Chrome 옵션에 performance 로그와 pageLoadStrategy "none"을 설정 """
+    options.set_capability("goog:loggingPrefs", {"performance": "ALL"})
+    options.page_load_strategy = "none"  # driver.get()이 로딩 완료를 기다리지 않음
+    return options
+
+
+def _is_empty(value):
+    return value is None or value == "" or value == [] or value == {}
+
+
+def find_value(obj, keys):
+    """ dict/list를 깊이 우선으로 탐색해 keys 중 하나의 첫 번째 비어 있지 않은 값을 반환 """
+    if isinstance(obj, dict):
+        for key in keys:
+            if key in obj and not _is_empty(obj[key]):
+                return obj[key]
+        children = obj.values()
+    elif isinstance(obj, list):
+        children = obj
+    else:
+        return None
+    for child in children:
+        found = find_value(child, keys)
+        if found is not None:
+            return found
+    return None
+
+
+def property_id_from_url(url):
+    """ URL 쿼리스트링의 숙소 ID (없으면 None) """
+    match = PROPERTY_ID_PARAM.search(url or "")
+    return match.group(1) if match else None
+
+
+def _property_id(node):
+    for key in PROPERTY_ID_KEYS:
+        if node.get(key) not in (None, ""):
+            return str(node[key])
+    return None
+
+
+def property_nodes(payloads, property_id=None):
+    """
+    응답들에서 이 호텔의 노드를 찾습니다 (PROPERTY_PATHS 위치만 봄).
+    property_id가 있으면 ID가 같은 노드만, 없으면 그 위치에 후보가 하나뿐일 때만 인정합니다.
+    """
+    nodes = []
+    for payload in payloads:
+        for path in PROPERTY_PATHS:
+            node = payload
+            for key in path:
+                node = node.get(key) if isinstance(node, dict) else None
+            candidates = [item for item in node if isinstance(item, dict)] if isinstance(node, list) else \
+                [node] if isinstance(node, dict) else []
+            for candidate in candidates:
+                node_id = _property_id(candidate)
+                if property_id is not None and node_id is not None:
+                    if node_id == str(property_id):
+                        nodes.append(candidate)
+                elif len(candidates) == 1:
+                    nodes.append(candidate)
+    return nodes
+
+
+def property_value(nodes, keys):
+    """ 호텔 노드 자체 또는 SECTION_KEYS 섹션에서 keys 중 첫 번째 비어 있지 않은 값 """
+    for node in nodes:
+        for section in (node,) + tuple(node.get(key) for key in SECTION_KEYS):
+            if not isinstance(section, dict):
+                continue
+            for key in keys:
+                if key in section and not _is_empty(section[key]):
+                    return section[key]
+    return None
+
+
+def _text(item):
+    if isinstance(item, str):
+        return item.strip()
+    if isinstance(item, dict):
+        value = find_value(item, TEXT_KEYS)
+        return value.strip() if isinstance(value, str) else None
+    return None
+
+
+def _number(value):
+    if isinstance(value, dict):
+        value = find_value(value, ("value", "amount", "perNight", "display"))
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return float(value)
+    if isinstance(value, str):
+        digits = re.sub(r"[^\d.]", "", value)
+        try:
+            return float(digits) if digits else None
+        except ValueError:
+            return None
+    return None
+
+
+def _format_price(amount, currency):
+    currency = {"KRW": "₩"}.get(currency, currency or "")
+    return f"{currency} {amount:,.0f}".strip()
+
+
+def extract_fields(payloads, property_id=None):
+    """
+    캡처한 JSON 응답들({종류: [본문, ...]})에서 시트 필드를 추출합니다.
+    이 호텔의 노드(property_nodes)에서 찾지 못한 필드는 결과에 넣지 않습니다.
+
+    Args:
+        property_id (str): 숙소 ID (URL에 없으면 호텔 정보 응답의 ID로 객실 응답을 확인)
+
+    Returns:
+        dict: scrape_agoda_hotel_info()와 같은 키 + "Room Prices" (객실별 가격)
+    """
+    data = {}
+    secondary = property_nodes(payloads.get("secondary", []), property_id)
+    if property_id is None:
+        ids = {node_id for node_id in map(_property_id, secondary) if node_id}
+        if len(ids) > 1:
+            secondary = []  # 어느 호텔의 응답인지 알 수 없으면 DOM에서 추출
+        property_id = ids.pop() if len(ids) == 1 else None
+    rooms_payloads = property_nodes(payloads.get("rooms", []), property_id)
+
+    name = property_value(secondary, NAME_KEYS)
+    if isinstance(name, str):
+        data["Hotel Name"] = name.strip()
+
+    address = property_value(secondary, ADDRESS_KEYS)
+    if isinstance(address, dict):
+        parts = [address.get(key) for key in ("address", "full", "area", "city", "country")]
+        address = ", ".join(part for part in parts if isinstance(part, str) and part)
+    if isinstance(address, str) and address:
+        data["Location"] = address.strip()
+
+    stars = _number(property_value(secondary, STAR_KEYS))
+    if stars is not None:
+        data["Review Score"] = f"{int(round(stars))}성급"
+
+    features = property_value(secondary, FEATURE_KEYS)
+    if isinstance(features, list):
+        texts = [text for text in map(_text, features) if text]
+        if texts:
+            data["Features"] = ", ".join(texts[:5])
+
+    reviews = property_value(secondary, REVIEW_KEYS)
+    if isinstance(reviews, list):
+        texts = [text for text in map(_text, reviews) if text]
+        if texts:
+            data["Reviews Summary"] = ", ".join(texts[:4])
+
+    rooms = property_value(rooms_payloads, ROOM_KEYS)
+    if isinstance(rooms, list):
+        room_prices = []
+        for room in rooms:
+            if not isinstance(room, dict):
+                continue
+            amount = _number(find_value(room, ROOM_PRICE_KEYS))
+            if amount is None:
+                continue
+            room_name = find_value(room, ROOM_NAME_KEYS)
+            currency = find_value(room, CURRENCY_KEYS)
+            room_prices.append((amount, room_name if isinstance(room_name, str) else "객실",
+                                currency if isinstance(currency, str) else None))
+        if room_prices:
+            cheapest = min(room_prices, key=lambda room: room[0])
+            data["Price"] = _format_price(cheapest[0], cheapest[2])
+            data["Room Prices"] = "; ".join(
+                f"{room_name}: {_format_price(amount, currency)}" for amount, room_name, currency in room_prices
+            )
+    return data
+
+
+class NetworkCapture:
+    """ 한 페이지 로드 동안 CAPTURE_TARGETS에 맞는 JSON 응답을 모읍니다. """
+
+    def __init__(self, driver, targets=None, property_id=None):
+        self.driver = driver
+        self.targets = targets or CAPTURE_TARGETS
+        self.property_id = property_id  # 다른 호텔의 응답에서 필드를 읽지 않도록 노드를 확인하는 데 씀
+        self.pending = {}   # requestId -> 응답 종류 (본문 수신 대기 중)
+        self.payloads = {}  # 응답 종류 -> [JSON 본문, ...]
+        try:
+            driver.execute_cdp_cmd("Network.enable", {})
+        except Exception as e:
+            print(f"[LOG] Network.enable 실패: {e}")
+
+    def _match(self, url):
+        for kind, (pattern, _) in self.targets.items():
+            if pattern.search(url):
+                return kind
+        return None
+
+    def _read_body(self, request_id, kind):
+        try:
+            result = self.driver.execute_cdp_cmd("Network.getResponseBody", {"requestId": request_id})
+            body = result.get("body", "")
+            if result.get("base64Encoded"):
+                body = base64.b64decode(body).decode("utf-8", errors="replace")
+            self.payloads.setdefault(kind, []).append(json.loads(body))
+            metrics.incr("agoda_captured_payloads", kind=kind)
+        except Exception as e:
+            # 본문이 이미 버려졌거나 JSON이 아닌 응답 — 다른 응답을 계속 기다림
+            print(f"[LOG] 응답 본문 읽기 실패 ({kind}): {e}")
+            metrics.incr("agoda_capture_errors", kind=kind)
+
+    def poll(self):
+        """ 지금까지 쌓인 performance 로그를 처리 """
+        for entry in self.driver.get_log("performance"):
+            try:
+                message = json.loads(entry["message"])["message"]
+            except (KeyError, ValueError):
+                continue
+            method = message.get("method")
+            params = message.get("params", {})
+            if method == "Network.responseReceived":
+                response = params.get("response", {})
+                kind = self._match(response.get("url", ""))
+                if kind and "json" in response.get("mimeType", ""):
+                    self.pending[params["requestId"]] = kind
+            elif method == "Network.loadingFinished" and params.get("requestId") in self.pending:
+                self._read_body(params["requestId"], self.pending.pop(params["requestId"]))
+
+    def collect(self, fields, timeout=20, poll_interval=0.2):
+        """
+        fields가 모두 추출되거나 timeout이 지날 때까지 응답을 모읍니다.
+        모두 모이면 window.stop()으로 페이지 로딩을 중단합니다.
+
+        Returns:
+            dict: 추출된 필드 (일부만 있을 수 있음)
+        """
+        capturable = set().union(*(provides for _, provides in self.targets.values()))
+        fields = set(fields) & capturable  # 어떤 응답에도 없는 필드는 기다리지 않음
+        deadline = time.monotonic() + timeout
+        data = {}
+        with metrics.timer("agoda_network_capture"):
+            while True:
+                self.poll()
+                data = extract_fields(self.payloads, self.property_id)
+                if fields <= data.keys():
+                    self.driver.execute_script("window.stop();")
+                    break
+                if time.monotonic() >= deadline:
+                    missing = sorted(fields - data.keys())
+                    print(f"[LOG] 네트워크 캡처 시간 초과, 찾지 못한 필드: {missing}")
+                    break
+                time.sleep(poll_interval)
+        return data
@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+"""
+scraping: single entry point for every scraper in this repository.
+
+Subcommands:
+    agoda          Agoda hotel info -> Google Sheets (get_hotel_info)
+    naver-images   Naver image search download (get_hotel_image)
+    netflix        Naver Netflix weekly ranking, Korean title (get_drama_of_netflix)
+    blog           SEO blog post: Sheets + Dropbox + OpenAI -> Hashnode (seo_blogpost_maker)
+    fetch-html     Save a page's full HTML (common tools)
+
+Only the standard library is imported at startup. Each subcommand imports
+its scraper module (and selenium, gspread, openai, ...) when it runs, so
+`--help` and short cron runs start immediately.
+
+Examples:
+    python scraping.py agoda --once
+    python scraping.py naver-images --query "나트랑 버고호텔" --dry-run
+    python scraping.py --import-report naver-images --query test --dry-run
+"""
+
+import argparse
+import os
+import re
+import subprocess
+import sys
+
+ROOT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# subcommand -> (directory, module). The directory is put on sys.path right before import.
+MODULES = {
+    "agoda": ("get_hotel_info", "agoda_hotel_scraper"),
+    "naver-images": ("get_hotel_image", "hotel_image_naver"),
+    "netflix": ("get_drama_of_netflix", "drama_of_netflix"),
+    "blog": ("seo_blogpost_maker", "main"),
+    "fetch-html": ("common tools", "get_all_html"),
+}
+
+# subcommand -> environment variable the module reads its config path from
+CONFIG_ENV = {
+    "agoda": "AGODA_CONFIG_PATH",
+    "blog": "SEO_CONFIG_PATH",
+}
+# config_loader.load_config의 strip_quotes (프로젝트마다 값 파싱 방식이 다름)
+CONFIG_STRIP_QUOTES = {
+    "agoda": True,
+    "blog": False,
+}
+
+
+def load_module(command):
+    """ Imports the scraper module for a subcommand (lazily, on first use). """
+    directory, module_name = MODULES[command]
+    path = os.path.join(ROOT_DIR, directory)
+    if path not in sys.path:
+        sys.path.insert(0, path)
+    __import__(module_name)
+    return sys.modules[module_name]
+
+
+def prepare_config(args):
+    """
+    Loads the config file once through the shared loader so every module
+    that asks for the same path gets the cached copy.
+    """
+    env_name = CONFIG_ENV.get(args.command)
+    if not env_name or not args.config:
+        return
+    os.environ[env_name] = os.path.abspath(args.config)
+    sys.path.insert(0, os.path.join(ROOT_DIR, "common tools"))
+    from config_loader import load_config
+    load_config(os.environ[env_name], strip_quotes=CONFIG_STRIP_QUOTES[args.command])
+
+
+def run_agoda(args):
+    if args.capture_network:
+        os.environ["AGODA_CAPTURE_MODE"] = "network"
+    module = load_module("agoda")
+    module.main(once=args.once, refresh_prices=args.refresh_prices, listing_urls=args.listing_url,
+                refresh_stale=args.refresh_stale)
+
+
+def run_naver_images(args):
+    if args.diagnostics:
+        os.environ["SCRAPING_DIAGNOSTICS"] = args.diagnostics
+    module = load_module("naver-images")
+    module.main(query=args.query, dry_run=args.dry_run, num_images=args.num_images)
+
+
+def run_netflix(args):
+    module = load_module("netflix")
+    module.main()
+
+
+def run_blog(args):
+    module = load_module("blog")
+    module.main()
+
+
+def run_fetch_html(args):
+    module = load_module("fetch-html")
+    if args.archive:
+        module.archive_response_html(args.url, archive_dir=args.archive)
+    else:
+        module.save_response_html_to_file(args.url, filename=args.output)
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="scraping", description="Run one of the repository's scrapers.")
+    parser.add_argument("--import-report", action="store_true",
+                        help="run the command under `python -X importtime` and print the slowest imports")
+    parser.add_argument("--import-report-top", type=int, default=15, metavar="N")
+    sub = parser.add_subparsers(dest="command", required=True, metavar="COMMAND")
+
+    agoda = sub.add_parser("agoda", help="scrape Agoda hotel info into Google Sheets")
+    agoda.add_argument("--once", action="store_true", help="process one row and exit instead of the hourly loop")
+    agoda.add_argument("--refresh-prices", action="store_true",
+                       help="update only the price column from Agoda city/search result pages, then exit")
+    agoda.add_argument("--refresh-stale", action="store_true",
+                       help="re-scrape only fields older than their refresh policy (price 6h, reviews 7d, rest 30d), then exit")
+    agoda.add_argument("--listing-url", action="append", metavar="URL",
+                       help="result page for --refresh-prices/--refresh-stale (repeatable; default: PRICE_LISTING_URLS in config)")
+    agoda.add_argument("--capture-network", action="store_true",
+                       help="read fields from the page's JSON API responses (CDP) instead of waiting for the DOM")
+    agoda.add_argument("--config", help="config.txt path (default: get_hotel_info/config.txt)")
+    agoda.set_defaults(func=run_agoda)
+
+    naver = sub.add_parser("naver-images", help="download hotel images from Naver image search")
+    naver.add_argument("--query", help="search query; skips reading/updating Google Sheets")
+    naver.add_argument("--num-images", type=int, default=4)
+    naver.add_argument("--dry-run", action="store_true", help="print the search URL only (no Chrome, no downloads)")
+    naver.add_argument("--diagnostics", choices=("off", "failure", "sample", "always"),
+                       help="when to save screenshots/HTML (default: failure; env SCRAPING_DIAGNOSTICS)")
+    naver.set_defaults(func=run_naver_images)
+
+    netflix = sub.add_parser("netflix", help="find the Korean title in Naver's Netflix weekly ranking")
+    netflix.set_defaults(func=run_netflix)
+
+    blog = sub.add_parser("blog", help="generate and publish one SEO blog post")
+    blog.add_argument("--config", help="config.txt path (default: seo_blogpost_maker/config.txt)")
+    blog.set_defaults(func=run_blog)
+
+    fetch = sub.add_parser("fetch-html", help="save a page's full HTML to a file")
+    fetch.add_argument("url")
+    fetch.add_argument("-o", "--output", default="response.html")
+    fetch.add_argument("--archive", metavar="DIR",
+                       help="store into a compressed, deduplicated snapshot archive instead of --output")
+    fetch.set_defaults(func=run_fetch_html)
+    return parser
+
+
+def import_report(argv, top):
+    """
+    Re-runs this CLI with `-X importtime` and prints the modules with the
+    largest cumulative import time.
+    """
+    child_argv = [a for a in argv if a != "--import-report"]
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", os.path.abspath(__file__)] + child_argv,
+        stderr=subprocess.PIPE, text=True
+    )
+    rows = []
+    other_stderr = []
+    for line in completed.stderr.splitlines():
+        match = re.match(r"import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)", line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            rows.append((int(cumulative_us), int(self_us), len(indent) // 2, name))
+        elif not line.startswith("import time:"):
+            other_stderr.append(line)
+    if other_stderr:
+        print("\n".join(other_stderr), file=sys.stderr)
+
+    total_us = sum(cumulative for cumulative, _, depth, _ in rows if depth == 0)
+    print(f"\nImport time report: {len(rows)} modules, {total_us / 1000:.1f} ms total")
+    print(f"{'cumulative ms':>14} {'self ms':>9}  module")
+    for cumulative, self_us, _, name in sorted(rows, reverse=True)[:top]:
+        print(f"{cumulative / 1000:>14.1f} {self_us / 1000:>9.1f}  {name}")
+    return completed.returncode
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.import_report:
+        return import_report(argv, args.import_report_top)
+    prepare_config(args)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
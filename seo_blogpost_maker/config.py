@@ -1,18 +1,18 @@
 import os
+import sys
 
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
-CONFIG_PATH = os.path.join(BASE_DIR, "config.txt")
+
+# 공용 모듈(common tools) 경로 추가
+sys.path.append(os.path.join(BASE_DIR, "..", "common tools"))
+from config_loader import load_config
+# SEO_CONFIG_PATH로 다른 설정 파일을 지정할 수 있음 (부하 테스트 등)
+CONFIG_PATH = os.environ.get("SEO_CONFIG_PATH", os.path.join(BASE_DIR, "config.txt"))
 GOOGLE_AUTH = os.path.join(BASE_DIR, "google_credentials.json")
 PROMPT_PATH = os.path.join(BASE_DIR, "prompt.txt")
 
 def load_api_keys():
-    with open(CONFIG_PATH, "r", encoding="utf-8") as f:
-        keys = {}
-        for line in f:
-            if "=" in line:
-                key, value = line.strip().split("=", 1)
-                keys[key] = value
-    return keys
+    return load_config(CONFIG_PATH, strip_quotes=False)  # 값은 따옴표/공백까지 그대로 사용
 
 keys = load_api_keys()
 
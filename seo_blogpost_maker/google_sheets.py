@@ -4,10 +4,10 @@ from config import GOOGLE_AUTH, SHEET_NAME, TAB_NAME
 from datetime import datetime
 import os
 
-print("현재 GOOGLE_AUTH 경로:", GOOGLE_AUTH)
-print("파일 존재 여부:", os.path.exists(GOOGLE_AUTH))
-
 def get_google_sheet():
+    if not os.path.exists(GOOGLE_AUTH):
+        print("GOOGLE_AUTH 파일이 없습니다:", GOOGLE_AUTH)
+
     scopes = [
         "https://www.googleapis.com/auth/spreadsheets",
         "https://www.googleapis.com/auth/drive.file",
@@ -1,33 +1,261 @@
+import collections
+import hashlib
+import json
+import logging
+import os
+import re
+import sys
+import threading
+import time
+
 import requests
-from config import HASHNODE_API_KEY, HASHNODE_BLOG_ID
+from requests.adapters import HTTPAdapter
+from config import BASE_DIR, HASHNODE_API_KEY, HASHNODE_BLOG_ID
 
-def post_to_hashnode(title, content):
-    url = "https://gql.hashnode.com"
-    headers = {
-        "Authorization": HASHNODE_API_KEY,
-        "Content-Type": "application/json"
-    }
+# 공용 모듈(common tools) 경로 추가
+sys.path.append(os.path.join(BASE_DIR, "..", "common tools"))
+import metrics
 
-    payload = {
-        "query": """
-        mutation PublishPost($input: PublishPostInput!) {
-            publishPost(input: $input) {
+HASHNODE_URL = "https://gql.hashnode.com"
+LEDGER_PATH = os.path.join(BASE_DIR, "publish_ledger.json")
+REQUEST_TIMEOUT = (5, 60)  # (connect, read) 초
+
+POST_FIELDS = """
                 post {
                     id
                     title
                     url
                 }
+"""
+
+_session = None
+_session_lock = threading.Lock()
+_ledger_lock = threading.Lock()
+
+# 최근 요청별 지연 시간 기록: {"operation", "posts", "seconds", "status"}
+# (오래 실행되는 프로세스에서도 커지지 않도록 최근 1000건만 보관, 전체 분포는 metrics의 hashnode_request_seconds)
+request_latencies = collections.deque(maxlen=1000)
+
+
+def get_session():
+    """ 연결을 재사용하는 공용 requests.Session 반환 (최초 호출 시 생성) """
+    global _session
+    with _session_lock:
+        if _session is None:
+            session = requests.Session()
+            # POST는 재전송 시 중복 게시가 생길 수 있으므로 어댑터 레벨 재시도는 사용하지 않음
+            adapter = HTTPAdapter(pool_connections=2, pool_maxsize=4, max_retries=0)
+            session.mount("https://", adapter)
+            session.headers.update({
+                "Authorization": HASHNODE_API_KEY,
+                "Content-Type": "application/json"
+            })
+            _session = session
+    return _session
+
+
+def _graphql(query, variables, operation, posts=1):
+    """
+    GraphQL 요청을 보내고 지연 시간을 기록한 뒤 응답 JSON을 반환합니다.
+    타임아웃/연결 오류나 JSON이 아닌 응답(502 HTML 등)은 예외 대신 {"errors": [...]}로 반환해
+    호출 측의 에러 처리(원장 행을 pending으로 유지)를 그대로 타게 합니다.
+    """
+    started = time.perf_counter()
+    status = "error"
+    try:
+        response = get_session().post(
+            HASHNODE_URL,
+            json={"query": query, "variables": variables},
+            timeout=REQUEST_TIMEOUT
+        )
+        status = response.status_code
+        return response.json()
+    except ValueError:  # requests.JSONDecodeError도 여기서 처리 (RequestException의 하위 클래스이기도 함)
+        logging.warning(f"[Hashnode] {operation} 응답이 JSON이 아님 (status={status})")
+        return {"errors": [{"message": f"non-JSON response (HTTP {status})"}]}
+    except requests.RequestException as e:
+        logging.warning(f"[Hashnode] {operation} 요청 실패: {e}")
+        return {"errors": [{"message": f"request failed: {e}"}]}
+    finally:
+        elapsed = time.perf_counter() - started
+        metrics.observe("hashnode_request_seconds", elapsed, operation=operation, status=str(status))
+        request_latencies.append({
+            "operation": operation,
+            "posts": posts,
+            "seconds": round(elapsed, 4),
+            "status": status
+        })
+        logging.debug(f"[Hashnode] {operation} ({posts}건) {elapsed:.2f}초, status={status}")
+
+
+# ---------------------------------------------------------------------------
+# 멱등성 원장 (시트 행 번호 → 게시 상태)
+# ---------------------------------------------------------------------------
+
+def load_ledger():
+    if not os.path.exists(LEDGER_PATH):
+        return {}
+    with open(LEDGER_PATH, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _save_ledger(ledger):
+    tmp_path = LEDGER_PATH + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(ledger, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, LEDGER_PATH)  # 원자적 교체로 중간 상태 파일이 남지 않도록 함
+
+
+def _update_ledger(row_idx, **fields):
+    with _ledger_lock:
+        ledger = load_ledger()
+        entry = ledger.setdefault(str(row_idx), {})
+        entry.update(fields)
+        _save_ledger(ledger)
+        return entry
+
+
+def make_slug(title, row_idx):
+    """
+    행 번호와 제목으로 고정 slug를 만듭니다.
+    타임아웃 후 재시도할 때 같은 slug로 기존 게시물을 조회해 중복 게시를 막는 데 사용합니다.
+    """
+    base = re.sub(r"[^a-z0-9]+", "-", title.lower()).strip("-")[:40]
+    digest = hashlib.sha1(f"{row_idx}:{title}".encode("utf-8")).hexdigest()[:8]
+    return "-".join(part for part in (base, f"row{row_idx}", digest) if part)
+
+
+def find_post_by_slug(slug):
+    """ 게시 여부가 불확실한 행(published가 아닌 행)에 대해 Hashnode에 실제 게시물이 있는지 확인 """
+    query = """
+    query PostBySlug($id: ObjectId!, $slug: String!) {
+        publication(id: $id) {
+            post(slug: $slug) {
+                id
+                title
+                url
             }
         }
-        """,
-        "variables": {
-            "input": {
-                "title": title,
-                "contentMarkdown": content,
-                "publicationId": HASHNODE_BLOG_ID
-            }
+    }
+    """
+    result = _graphql(query, {"id": HASHNODE_BLOG_ID, "slug": slug}, "lookup")
+    publication = (result.get("data") or {}).get("publication") or {}
+    return publication.get("post")
+
+
+def _resolve_from_ledger(row_idx):
+    """
+    원장에 기록된 행이면 게시물 정보를 반환합니다.
+    - published: 저장된 게시물 반환
+    - 그 밖의 상태(pending, 예전 원장의 failed): 타임아웃/부분 에러 뒤에도 서버에는 게시됐을 수 있으므로
+      slug로 조회한 뒤에만 다시 게시
+    """
+    entry = load_ledger().get(str(row_idx))
+    if not entry:
+        return None
+    if entry.get("state") == "published":
+        return entry["post"]
+    if entry.get("slug"):
+        post = find_post_by_slug(entry["slug"])
+        if post:
+            _update_ledger(row_idx, state="published", post=post)
+            return post
+    return None
+
+
+def _post_response(post):
+    """ 기존 post_to_hashnode() 응답 형식으로 감싸기 """
+    return {"data": {"publishPost": {"post": post}}}
+
+
+@metrics.timed()
+def post_to_hashnode(title, content, row_idx=None):
+    """
+    Hashnode에 글 하나를 게시합니다.
+    row_idx를 주면 원장을 확인하여 이미 게시된 행은 다시 게시하지 않습니다.
+    """
+    if row_idx is None:
+        return _publish_single(title, content)
+
+    post = _resolve_from_ledger(row_idx)
+    if post:
+        logging.info(f"[Hashnode] {row_idx}행은 이미 게시됨: {post['url']}")
+        return _post_response(post)
+
+    results = publish_posts([(row_idx, title, content)])
+    return results[str(row_idx)]
+
+
+def _publish_single(title, content, slug=None):
+    query = """
+        mutation PublishPost($input: PublishPostInput!) {
+            publishPost(input: $input) {%s}
         }
+        """ % POST_FIELDS
+    post_input = {
+        "title": title,
+        "contentMarkdown": content,
+        "publicationId": HASHNODE_BLOG_ID
     }
+    if slug:
+        post_input["slug"] = slug
+    return _graphql(query, {"input": post_input}, "publish")
+
+
+def publish_posts(posts):
+    """
+    여러 글을 별칭(alias)을 붙인 mutation 하나로 한 번에 게시합니다.
+
+    Args:
+        posts (list): (row_idx, title, content) 튜플 목록
+
+    Returns:
+        dict: {row_idx(str): 응답} — 각 응답은 post_to_hashnode()와 같은 형식
+    """
+    results = {}
+    pending = []
+    for row_idx, title, content in posts:
+        post = _resolve_from_ledger(row_idx)
+        if post:
+            results[str(row_idx)] = _post_response(post)
+        else:
+            pending.append((row_idx, title, content))
+
+    if not pending:
+        return results
+
+    declarations = []
+    selections = []
+    variables = {}
+    for i, (row_idx, title, content) in enumerate(pending):
+        slug = make_slug(title, row_idx)
+        # 요청을 보내기 전에 pending으로 기록해 두어야 타임아웃 후 재실행 시 slug로 확인 가능
+        _update_ledger(row_idx, state="pending", slug=slug, title=title)
+        declarations.append(f"$input{i}: PublishPostInput!")
+        selections.append(f"p{i}: publishPost(input: $input{i}) {{{POST_FIELDS}}}")
+        variables[f"input{i}"] = {
+            "title": title,
+            "contentMarkdown": content,
+            "publicationId": HASHNODE_BLOG_ID,
+            "slug": slug
+        }
+
+    query = "mutation PublishPosts(%s) {\n%s\n}" % (", ".join(declarations), "\n".join(selections))
+    response = _graphql(query, variables, "publish_batch", posts=len(pending))
 
-    response = requests.post(url, json=payload, headers=headers)
-    return response.json()
+    data = response.get("data") or {}
+    errors = response.get("errors") or []
+    for i, (row_idx, title, content) in enumerate(pending):
+        alias = f"p{i}"
+        post = (data.get(alias) or {}).get("post")
+        if post:
+            _update_ledger(row_idx, state="published", post=post)
+            results[str(row_idx)] = _post_response(post)
+        else:
+            # 해당 별칭의 에러만 골라 전달 (path의 첫 요소가 별칭)
+            alias_errors = [e for e in errors if (e.get("path") or [None])[0] == alias] or errors
+            # 부분 에러/429/5xx 응답이어도 서버에서 게시됐을 수 있으므로 pending으로 남겨
+            # 다음 실행에서 slug 조회 후 재게시 여부를 결정
+            _update_ledger(row_idx, state="pending", last_error=(alias_errors or [{}])[0].get("message"))
+            results[str(row_idx)] = {"errors": alias_errors or [{"message": "no post returned"}]}
+    return results
@@ -0,0 +1,376 @@
+"""
+SEO 포스팅 파이프라인 부하 테스트 하네스
+
+main.main()이 호출하는 외부 서비스 4개(Google Sheets, Dropbox, OpenAI, Hashnode)를
+로컬 가짜 서비스로 바꾸어 N개의 가상 호텔을 게시하고, 처리량(posts/min)과
+단계별 p50/p95/p99 지연 시간, 게시물당 외부 호출 수를 보고합니다.
+
+- Sheets / Dropbox / OpenAI: 클라이언트 객체를 가짜 객체로 교체
+- Hashnode: 로컬 HTTP 서버를 띄워 실제 requests 세션 경로를 그대로 사용
+
+각 서비스마다 지연 시간, 오류율, 초당 호출 제한(초과 시 429)을 설정할 수 있습니다.
+
+사용 예:
+    python load_test.py --posts 50
+    python load_test.py --posts 100 --latency openai=3 --error-rate hashnode=0.05 --rate-limit sheets=1
+"""
+
+import argparse
+import json
+import os
+import random
+import re
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from types import SimpleNamespace
+
+SERVICES = ("sheets", "dropbox", "openai", "hashnode")
+DEFAULT_LATENCY = {"sheets": 0.3, "dropbox": 0.2, "openai": 2.0, "hashnode": 0.5}
+STAGES = ("get_hotel_name", "fetch_hotel_details", "generate_blog_content", "post_to_hashnode", "update_google_sheet")
+
+DUMMY_CONFIG = """OPENAI_API_KEY=load-test
+HASHNODE_API_KEY=load-test
+HASHNODE_BLOG_ID=load-test
+SHEET_NAME=load-test
+TAB_NAME=load-test
+DROPBOX_ACCESS_TOKEN=load-test
+DROPBOX_APP_KEY=load-test
+DROPBOX_APP_SECRET=load-test
+"""
+
+
+class FakeServiceError(Exception):
+    """ 가짜 서비스가 오류율/호출 제한에 따라 발생시키는 예외 """
+
+    def __init__(self, service, status):
+        super().__init__(f"{service} fake error (HTTP {status})")
+        self.status = status
+
+
+class FakeService:
+    """
+    공통 동작: 호출 수 집계, 지연 시간(±20% 지터), 오류율, 토큰 버킷 방식 호출 제한
+    """
+
+    def __init__(self, name, latency=0.0, error_rate=0.0, rate_limit=None):
+        self.name = name
+        self.latency = latency
+        self.error_rate = error_rate
+        self.rate_limit = rate_limit  # 초당 허용 호출 수 (None이면 무제한)
+        self.calls = 0
+        self.errors = 0
+        self.throttled = 0
+        self._tokens = rate_limit or 0
+        self._refilled_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _take_token(self):
+        if not self.rate_limit:
+            return True
+        now = time.monotonic()
+        self._tokens = min(self.rate_limit, self._tokens + (now - self._refilled_at) * self.rate_limit)
+        self._refilled_at = now
+        if self._tokens < 1:
+            return False
+        self._tokens -= 1
+        return True
+
+    def call(self):
+        """ 외부 호출 한 번을 흉내 냄. 실패 시 HTTP 상태 코드를, 성공 시 None을 반환 """
+        with self._lock:
+            self.calls += 1
+            allowed = self._take_token()
+            if not allowed:
+                self.throttled += 1
+        if not allowed:
+            return 429
+        if self.latency:
+            time.sleep(self.latency * random.uniform(0.8, 1.2))
+        if self.error_rate and random.random() < self.error_rate:
+            with self._lock:
+                self.errors += 1
+            return 500
+        return None
+
+    def check(self):
+        status = self.call()
+        if status:
+            raise FakeServiceError(self.name, status)
+
+    def stats(self):
+        return {"calls": self.calls, "errors": self.errors, "throttled": self.throttled}
+
+
+# ---------------------------------------------------------------------------
+# Google Sheets
+# ---------------------------------------------------------------------------
+
+class FakeWorksheet:
+    """ gspread Worksheet 중 파이프라인이 사용하는 메서드만 구현 """
+
+    def __init__(self, service, num_hotels):
+        self.service = service
+        header = ["A", "posted_at", "C", "post_url", "E", "F", "hotel_name", "price", "address", "star", "reviews", "extra"]
+        self.rows = [header]
+        for i in range(num_hotels):
+            self.rows.append([
+                f"호텔 {i}", "", "", "", "", "",
+                f"Load Test Hotel {i}", f"₩{random.randint(30, 300)},000", f"{i} Tran Phu, Nha Trang",
+                f"{random.randint(3, 5)}성급", "위치가 좋아요, 직원이 친절해요", "수영장, 조식"
+            ])
+
+    def get_all_values(self):
+        self.service.check()
+        return [list(row) for row in self.rows]
+
+    def update_acell(self, label, value):
+        self.service.check()
+        column, row = re.match(r"([A-Z]+)(\d+)", label).groups()
+        self.rows[int(row) - 1][ord(column) - ord("A")] = value
+
+
+# ---------------------------------------------------------------------------
+# Dropbox
+# ---------------------------------------------------------------------------
+
+class FakeDropbox:
+    """ dropbox.Dropbox 중 dropbox_handler가 사용하는 메서드만 구현 """
+
+    def __init__(self, service, images_per_hotel=4):
+        self.service = service
+        self.images_per_hotel = images_per_hotel
+        self._shared = set()
+
+    def users_get_current_account(self):
+        self.service.check()
+        return SimpleNamespace(account_id="load-test")
+
+    def files_list_folder(self, path):
+        self.service.check()
+        entries = [SimpleNamespace(path_display=f"{path}/image_{i}.jpg") for i in range(self.images_per_hotel)]
+        return SimpleNamespace(entries=entries)
+
+    def sharing_list_shared_links(self, path):
+        self.service.check()
+        links = [SimpleNamespace(url=self._url(path))] if path in self._shared else []
+        return SimpleNamespace(links=links)
+
+    def sharing_create_shared_link_with_settings(self, path):
+        self.service.check()
+        self._shared.add(path)
+        return SimpleNamespace(url=self._url(path))
+
+    @staticmethod
+    def _url(path):
+        return f"https://www.dropbox.com/s/loadtest{path.replace(' ', '_')}?dl=0"
+
+
+# ---------------------------------------------------------------------------
+# OpenAI (openai==0.28 ChatCompletion 인터페이스)
+# ---------------------------------------------------------------------------
+
+class FakeOpenAI:
+    def __init__(self, service):
+        self.service = service
+        self.ChatCompletion = SimpleNamespace(create=self._create)
+
+    def _create(self, model, messages):
+        self.service.check()
+        content = "\n\n".join(f"## 섹션 {i}\n(image)\n가상 본문입니다 ㅎㅎ" for i in range(4))
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
+
+
+# ---------------------------------------------------------------------------
+# Hashnode (로컬 GraphQL 서버)
+# ---------------------------------------------------------------------------
+
+def make_hashnode_handler(service):
+    class HashnodeHandler(BaseHTTPRequestHandler):
+        def log_message(self, format, *args):
+            pass
+
+        def _reply(self, status, payload):
+            body = json.dumps(payload).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_POST(self):
+            request = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+            status = service.call()
+            if status:
+                return self._reply(status, {"errors": [{"message": f"fake HTTP {status}"}]})
+
+            query = request["query"]
+            variables = request.get("variables") or {}
+            if query.lstrip().startswith("query"):
+                return self._reply(200, {"data": {"publication": {"post": None}}})
+
+            data = {}
+            for alias, var in re.findall(r"(\w+): publishPost\(input: \$(\w+)\)", query) or [("publishPost", "input")]:
+                post_input = variables[var]
+                slug = post_input.get("slug") or f"post-{random.randint(0, 10 ** 9)}"
+                data[alias] = {"post": {"id": slug, "title": post_input["title"],
+                                        "url": f"https://loadtest.hashnode.dev/{slug}"}}
+            self._reply(200, {"data": data})
+
+    return HashnodeHandler
+
+
+# ---------------------------------------------------------------------------
+# 실행 및 집계
+# ---------------------------------------------------------------------------
+
+def percentile(samples, pct):
+    """ nearest-rank 백분위수 """
+    if not samples:
+        return None
+    ordered = sorted(samples)
+    rank = max(1, int(round(pct / 100 * len(ordered) + 0.5)))
+    return round(ordered[min(rank, len(ordered)) - 1], 4)
+
+
+def _timed_stage(samples, name, func):
+    def wrapper(*args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            samples[name].append(time.perf_counter() - started)
+    return wrapper
+
+
+def _record_errors(errors, func):
+    """ post_to_hashnode가 예외 없이 반환한 GraphQL errors 응답을 실패로 기록 """
+    def wrapper(*args, **kwargs):
+        response = func(*args, **kwargs)
+        if "errors" in response:
+            errors.append(response["errors"])
+        return response
+    return wrapper
+
+
+def run_load_test(num_posts, latency, error_rate, rate_limit):
+    fakes = {
+        name: FakeService(name, latency.get(name, 0.0), error_rate.get(name, 0.0), rate_limit.get(name))
+        for name in SERVICES
+    }
+
+    work_dir = tempfile.mkdtemp(prefix="seo_load_test_")
+    config_path = os.path.join(work_dir, "config.txt")
+    with open(config_path, "w", encoding="utf-8") as f:
+        f.write(DUMMY_CONFIG)
+    os.environ["SEO_CONFIG_PATH"] = config_path
+
+    import main as pipeline
+    import google_sheets
+    import dropbox_handler
+    import blog_generator
+    import hashnode_poster
+
+    worksheet = FakeWorksheet(fakes["sheets"], num_posts)
+    dbx = FakeDropbox(fakes["dropbox"])
+
+    def fake_get_google_sheet():
+        fakes["sheets"].check()  # 인증 + open_by_key 호출에 해당
+        return worksheet
+
+    def fake_get_dropbox_client():
+        dbx.users_get_current_account()
+        return dbx
+
+    google_sheets.get_google_sheet = fake_get_google_sheet
+    dropbox_handler.get_dropbox_client = fake_get_dropbox_client
+    blog_generator.openai = FakeOpenAI(fakes["openai"])
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), make_hashnode_handler(fakes["hashnode"]))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    hashnode_poster.HASHNODE_URL = "http://%s:%d/" % server.server_address[:2]
+    hashnode_poster.LEDGER_PATH = os.path.join(work_dir, "publish_ledger.json")
+
+    samples = {stage: [] for stage in STAGES}
+    for stage in STAGES:
+        setattr(pipeline, stage, _timed_stage(samples, stage, getattr(pipeline, stage)))
+    post_errors = []
+    pipeline.post_to_hashnode = _record_errors(post_errors, pipeline.post_to_hashnode)
+
+    failed = 0
+    started = time.perf_counter()
+    for _ in range(num_posts):
+        try:
+            pipeline.main()
+        except Exception as e:
+            failed += 1
+            print(f"[load_test] 게시 실패: {e}")
+    elapsed = time.perf_counter() - started
+    failed += len(post_errors)  # errors 응답도 게시 실패 (main()은 예외 없이 반환함)
+    server.shutdown()
+    server.server_close()
+
+    published = sum(1 for row in worksheet.rows[1:] if row[1])
+    total_calls = sum(fake.calls for fake in fakes.values())
+    return {
+        "posts_requested": num_posts,
+        "posts_published": published,
+        "posts_failed": failed,
+        "seconds": round(elapsed, 3),
+        "posts_per_minute": round(published / elapsed * 60, 2) if elapsed else None,
+        "stage_latency": {
+            stage: {
+                "count": len(values),
+                "p50": percentile(values, 50),
+                "p95": percentile(values, 95),
+                "p99": percentile(values, 99),
+            }
+            for stage, values in samples.items()
+        },
+        "external_calls": {name: fake.stats() for name, fake in fakes.items()},
+        "external_calls_per_post": round(total_calls / published, 2) if published else None,
+    }
+
+
+def _parse_service_values(pairs, option):
+    values = {}
+    for pair in pairs or []:
+        name, _, value = pair.partition("=")
+        if name not in SERVICES or not value:
+            raise SystemExit(f"{option}: '{pair}' 형식 오류 (예: openai=2.5, 서비스: {', '.join(SERVICES)})")
+        values[name] = float(value)
+    return values
+
+
+def main():
+    parser = argparse.ArgumentParser(description="SEO 포스팅 파이프라인 부하 테스트 (로컬 가짜 API 사용)")
+    parser.add_argument("--posts", type=int, default=20, help="가상 호텔 수")
+    parser.add_argument("--latency", action="append", metavar="SERVICE=SEC", help="서비스별 평균 지연 시간")
+    parser.add_argument("--error-rate", action="append", metavar="SERVICE=P", help="서비스별 오류 확률 (0~1)")
+    parser.add_argument("--rate-limit", action="append", metavar="SERVICE=RPS", help="서비스별 초당 호출 제한")
+    parser.add_argument("--time-scale", type=float, default=1.0, help="모든 지연 시간에 곱할 배율")
+    parser.add_argument("--output", help="결과 JSON 저장 경로")
+    args = parser.parse_args()
+
+    latency = dict(DEFAULT_LATENCY)
+    latency.update(_parse_service_values(args.latency, "--latency"))
+    latency = {name: value * args.time_scale for name, value in latency.items()}
+
+    report = run_load_test(
+        args.posts,
+        latency,
+        _parse_service_values(args.error_rate, "--error-rate"),
+        _parse_service_values(args.rate_limit, "--rate-limit"),
+    )
+    report["settings"] = {"latency": latency, "time_scale": args.time_scale}
+    output = json.dumps(report, ensure_ascii=False, indent=2)
+    print(output)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
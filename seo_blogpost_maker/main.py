@@ -10,7 +10,8 @@ def main():
 
     hotel_info = fetch_hotel_details(row_idx)
     content = generate_blog_content(hotel_info, row_idx)
-    post_response = post_to_hashnode(hotel_info["hotel_name"], content)
+    # row_idx를 넘겨 재실행 시 같은 행이 중복 게시되지 않도록 함
+    post_response = post_to_hashnode(hotel_info["hotel_name"], content, row_idx=row_idx)
 
     if "errors" in post_response:
         print("포스팅 실패:", post_response)